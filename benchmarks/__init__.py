@@ -0,0 +1,14 @@
+"""
+Пакет benchmarks - замеры производительности пакета notebook.
+
+Modules:
+    corpus: Детерминированный генератор заметок на русском языке
+    run: Замеры операций хранилища на разных объемах
+    gui_refresh: Замер обновления таблицы NoteApp без показа окна
+    compare: Сравнение результатов двух прогонов
+
+Запуск:
+    python -m benchmarks.run --sizes 1000 10000 100000 --out results.json
+    python -m benchmarks.gui_refresh --sizes 1000 10000 --out gui.json
+    python -m benchmarks.compare old.json new.json
+"""
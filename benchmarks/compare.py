@@ -0,0 +1,67 @@
+"""
+Модуль compare - сравнение результатов двух прогонов замеров.
+
+Для каждой пары (хранилище, объем, операция) печатается время до и после
+и отношение; замедления сверх порога отмечаются, а код возврата равен 1,
+если хотя бы одна операция замедлилась.
+
+Запуск:
+    python -m benchmarks.compare old.json new.json --threshold 1.2
+"""
+
+import argparse
+import json
+import sys
+from typing import Dict, Tuple
+
+
+def load_results(path: str) -> Dict[Tuple[str, int, str], Dict]:
+    """Читает файл результатов benchmarks.run или benchmarks.gui_refresh.
+
+    Args:
+        path (str): Путь к файлу результатов
+
+    Returns:
+        Dict[Tuple[str, int, str], Dict]: Строки по ключу (хранилище, объем, операция)
+    """
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+    return {(row["backend"], row["size"], row["op"]): row for row in data["results"]}
+
+
+def main(argv=None) -> int:
+    """Печатает таблицу сравнения.
+
+    Returns:
+        int: 1 если есть замедления сверх порога, иначе 0
+    """
+    parser = argparse.ArgumentParser(description="Сравнение результатов замеров")
+    parser.add_argument("old", help="результаты до изменения")
+    parser.add_argument("new", help="результаты после изменения")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="отношение new/old, начиная с которого операция считается замедлившейся")
+    args = parser.parse_args(argv)
+
+    old = load_results(args.old)
+    new = load_results(args.new)
+    regressions = 0
+    print(f"{'хранилище':>9} {'объем':>8} {'операция':<22} {'было, мс':>10} {'стало, мс':>10} {'new/old':>8}")
+    for key in sorted(old.keys() & new.keys()):
+        before, after = old[key]["seconds"], new[key]["seconds"]
+        ratio = after / before if before else float("inf")
+        mark = ""
+        if ratio >= args.threshold:
+            mark = "  медленнее"
+            regressions += 1
+        elif ratio <= 1 / args.threshold:
+            mark = "  быстрее"
+        backend, size, op = key
+        print(f"{backend:>9} {size:>8} {op:<22} {before * 1000:10.2f} {after * 1000:10.2f} {ratio:8.2f}{mark}")
+    for key in sorted(old.keys() ^ new.keys()):
+        side = "только в old" if key in old else "только в new"
+        print(f"{key[0]:>9} {key[1]:>8} {key[2]:<22} ({side})")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
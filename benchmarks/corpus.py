@@ -0,0 +1,82 @@
+"""
+Модуль corpus - генератор синтетических заметок для замеров.
+
+Заметки детерминированы (зависят только от seed) и похожи на настоящие:
+русские слова, длина текста с длинным хвостом, теги по закону Ципфа,
+реалистичная доля приоритетов и статусов, даты за два года.
+"""
+
+import json
+import random
+from datetime import datetime, timedelta
+from typing import Dict, Iterator
+
+WORDS = (
+    "работа дом учеба план список покупки встреча проект отчет задача "
+    "звонок письмо идея книга фильм рецепт лапша суп хлеб молоко "
+    "тренировка бег зал врач запись билет поезд отпуск море дача "
+    "ремонт краска форма силикон заказ клиент оплата счет налог банк "
+    "день неделя месяц утро вечер срочно важно потом сегодня завтра "
+    "приготовить убраться купить позвонить написать прочитать сделать "
+    "проверить отправить забрать починить выучить повторить обсудить"
+).split()
+
+TAGS = ("работа", "дом", "учеба", "покупки", "идеи", "здоровье", "финансы",
+        "поездки", "книги", "рецепты", "спорт", "семья", "проект", "срочно")
+
+PRIORITY_WEIGHTS = (("low", 30), ("medium", 50), ("high", 20))
+STATUS_WEIGHTS = (("active", 60), ("done", 30), ("archived", 10))
+
+START_DATE = datetime(2024, 1, 1)
+DATE_SPAN_SECONDS = 2 * 365 * 24 * 3600
+
+
+def _sentence(rng: random.Random, words: int) -> str:
+    """Собирает предложение из случайных слов."""
+    text = " ".join(rng.choice(WORDS) for _ in range(words))
+    return text[:1].upper() + text[1:] + "."
+
+
+def generate_notes(count: int, seed: int = 0) -> Iterator[Dict]:
+    """Генерирует заметки в формате Note.to_dict().
+
+    Args:
+        count (int): Число заметок
+        seed (int, optional): Зерно генератора. Defaults to 0.
+
+    Yields:
+        Dict: Заметка с ID от 1 до count
+    """
+    rng = random.Random(seed)
+    priorities, p_weights = zip(*PRIORITY_WEIGHTS)
+    statuses, s_weights = zip(*STATUS_WEIGHTS)
+    # Частота тега обратно пропорциональна его рангу (закон Ципфа)
+    tag_weights = [1 / (rank + 1) for rank in range(len(TAGS))]
+    created = sorted(rng.randrange(DATE_SPAN_SECONDS) for _ in range(count))
+    for i in range(count):
+        # Большинство заметок короткие, но встречаются и очень длинные
+        sentences = max(1, int(rng.lognormvariate(1.0, 1.0)))
+        content = " ".join(_sentence(rng, rng.randint(4, 14)) for _ in range(sentences))
+        tags = sorted(set(rng.choices(TAGS, tag_weights, k=rng.choice((0, 1, 1, 2, 3)))))
+        created_at = START_DATE + timedelta(seconds=created[i], microseconds=rng.randrange(10 ** 6))
+        yield {
+            "id": i + 1,
+            "title": _sentence(rng, rng.randint(1, 5))[:-1],
+            "content": content,
+            "priority": rng.choices(priorities, p_weights)[0],
+            "status": rng.choices(statuses, s_weights)[0],
+            "tags": tags,
+            "created_at": created_at.isoformat(),
+        }
+
+
+def write_corpus(path: str, count: int, seed: int = 0):
+    """Записывает корпус в файл в формате notes.json.
+
+    Args:
+        path (str): Путь к файлу
+        count (int): Число заметок
+        seed (int, optional): Зерно генератора. Defaults to 0.
+    """
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(list(generate_notes(count, seed)), f, ensure_ascii=False, indent=2)
@@ -0,0 +1,100 @@
+"""
+Модуль gui_refresh - замер обновления таблицы NoteApp.
+
+Окно создается скрытым (withdraw), замеряется полный путь обновления:
+загрузка заметок из хранилища и отрисовка таблицы. Для запуска нужен
+дисплей (на сервере подойдет Xvfb: xvfb-run python -m benchmarks.gui_refresh).
+
+Запуск:
+    python -m benchmarks.gui_refresh --sizes 1000 10000 --out gui.json
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sys
+import tempfile
+from typing import Dict, List
+
+from benchmarks.corpus import write_corpus
+from benchmarks.run import best_time, environment, open_backend
+from notebook.backends import BACKENDS
+
+QUERIES = ("", "работа", "#дом")
+
+
+def bench_refresh(app, backend: str, size: int, repeat: int) -> List[Dict]:
+    """Замеряет обновление списка заметок для нескольких запросов.
+
+    Args:
+        app (NoteApp): Приложение со скрытым окном
+        backend (str): Имя хранилища
+        size (int): Число заметок
+        repeat (int): Число повторов
+
+    Returns:
+        List[Dict]: Строки результатов
+    """
+    results = []
+    for query in QUERIES:
+        def refresh():
+            app.show_notes(app.load_notes(query))
+            app.root.update_idletasks()
+
+        seconds = best_time(refresh, repeat)
+        op = f"refresh:{query}" if query else "refresh"
+        results.append(dict(backend=backend, size=size, op=op, seconds=seconds))
+        print(f"{backend:>8} {size:>8} {op:<22} {seconds * 1000:10.2f} мс", file=sys.stderr)
+    return results
+
+
+def main(argv=None):
+    """Разбирает аргументы и запускает замеры."""
+    parser = argparse.ArgumentParser(description="Замеры обновления таблицы NoteApp")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1000, 10000])
+    parser.add_argument("--backends", nargs="+", default=["json"], choices=sorted(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_gui.json")
+    args = parser.parse_args(argv)
+
+    import tkinter as tk
+    from gui.app import NoteApp
+
+    try:
+        root = tk.Tk()
+    except tk.TclError as e:
+        print(f"Не удалось создать окно: {e}", file=sys.stderr)
+        sys.exit(1)
+    root.withdraw()
+
+    results = []
+    workdir = tempfile.mkdtemp(prefix="bench_gui_")
+    try:
+        for size in args.sizes:
+            corpus_path = os.path.join(workdir, f"notes_{size}.json")
+            write_corpus(corpus_path, size, args.seed)
+            for backend in args.backends:
+                backend_dir = os.path.join(workdir, f"{backend}_{size}")
+                os.mkdir(backend_dir)
+                storage = open_backend(backend, backend_dir, corpus_path)
+                frame = tk.Toplevel(root)
+                frame.withdraw()
+                app = NoteApp(frame, storage)
+                results.extend(bench_refresh(app, backend, size, args.repeat))
+                app.worker.shutdown()
+                storage.close()
+                frame.destroy()
+    finally:
+        root.destroy()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump({"environment": environment(), "seed": args.seed, "results": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,220 @@
+"""
+Модуль run - замеры операций хранилища заметок.
+
+Для каждого объема корпуса и каждого хранилища замеряются холодная
+загрузка (время и пиковая память через tracemalloc), повторный get_all,
+поиск заметки по ID, полнотекстовый поиск (в том числе посимвольный
+набор запроса через SearchSession), выборка первых заметок по приоритету,
+добавление, изменение и удаление. Результаты пишутся в JSON для сравнения между коммитами
+(см. benchmarks.compare).
+
+Запуск:
+    python -m benchmarks.run --sizes 1000 10000 100000 1000000 --out results.json
+"""
+
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from notebook import Note, SqliteStorage
+from notebook.backends import BACKENDS, backend_class
+from benchmarks.corpus import write_corpus
+from gui.search_session import SearchSession
+
+DEFAULT_SIZES = (1000, 10000, 100000)
+SEARCH_QUERIES = ("работа", "прове", "#дом", "купить молоко")
+
+
+def best_time(func: Callable, repeat: int) -> float:
+    """Возвращает лучшее время из нескольких запусков.
+
+    Args:
+        func (Callable): Замеряемая функция
+        repeat (int): Число запусков
+
+    Returns:
+        float: Время в секундах
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def peak_memory(func: Callable) -> int:
+    """Замеряет пиковый объем памяти, выделенной функцией.
+
+    Args:
+        func (Callable): Замеряемая функция
+
+    Returns:
+        int: Пиковый объем в байтах
+    """
+    tracemalloc.start()
+    try:
+        func()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def open_backend(backend: str, workdir: str, corpus_path: str):
+    """Открывает хранилище над копией корпуса.
+
+    Args:
+        backend (str): Имя хранилища из notebook.backends.BACKENDS
+        workdir (str): Рабочий каталог этого хранилища
+        corpus_path (str): Путь к сгенерированному notes.json
+
+    Returns:
+        Storage: Открытое хранилище
+    """
+    notes_path = os.path.join(workdir, "notes.json")
+    if not os.path.exists(notes_path):
+        shutil.copyfile(corpus_path, notes_path)
+    if backend == "sqlite":
+        return SqliteStorage(os.path.join(workdir, "notes.db"), notes_path)
+    return backend_class(backend)(notes_path)
+
+
+def type_query(storage, query: str):
+    """Выполняет поиск после каждой набранной буквы запроса, как при вводе."""
+    session = SearchSession(storage)
+    for end in range(1, len(query) + 1):
+        session.search(query[:end])
+
+
+def bench_backend(backend: str, size: int, corpus_path: str, repeat: int) -> List[Dict]:
+    """Замеряет операции одного хранилища на одном объеме.
+
+    Args:
+        backend (str): Имя хранилища
+        size (int): Число заметок в корпусе
+        corpus_path (str): Путь к корпусу
+        repeat (int): Число повторов быстрых операций
+
+    Returns:
+        List[Dict]: Строки результатов
+    """
+    results = []
+
+    def record(op: str, seconds: float, **extra):
+        results.append(dict(backend=backend, size=size, op=op, seconds=seconds, **extra))
+        print(f"{backend:>8} {size:>8} {op:<22} {seconds * 1000:10.2f} мс", file=sys.stderr)
+
+    workdir = tempfile.mkdtemp(prefix=f"bench_{backend}_")
+    try:
+        # Первое открытие переносит notes.json в формат хранилища
+        start = time.perf_counter()
+        storage = open_backend(backend, workdir, corpus_path)
+        storage.get_all()
+        record("open_first", time.perf_counter() - start)
+        storage.close()
+
+        # Холодная загрузка: новый объект хранилища без кэша
+        start = time.perf_counter()
+        storage = open_backend(backend, workdir, corpus_path)
+        storage.get_all()
+        cold = time.perf_counter() - start
+        storage.close()
+        # Память замеряется отдельно: tracemalloc замедляет выделения
+        storage = None
+
+        def load():
+            nonlocal storage
+            storage = open_backend(backend, workdir, corpus_path)
+            storage.get_all()
+
+        peak = peak_memory(load)
+        storage.close()
+        record("load_cold", cold, peak_bytes=peak)
+
+        storage = open_backend(backend, workdir, corpus_path)
+        storage.get_all()
+        record("get_all_warm", best_time(storage.get_all, repeat))
+        ids = [size // 2, size, 1]
+        record("lookup", best_time(lambda: [storage.get(i) for i in ids], repeat) / len(ids))
+        record("search_first", best_time(lambda: storage.search(SEARCH_QUERIES[0]), 1))
+        for query in SEARCH_QUERIES:
+            record(f"search:{query}", best_time(lambda: storage.search(query), repeat))
+        # Набор запроса по буквам: среднее время на нажатие клавиши
+        typed = SEARCH_QUERIES[-1]
+        record("search_typing", best_time(lambda: type_query(storage, typed), repeat) / len(typed))
+        # Первый вызов строит порядок сортировки, следующие берут первые N из него
+        record("order_first", best_time(lambda: storage.order_by("priority", True, 50), 1))
+        record("order_top", best_time(lambda: storage.order_by("priority", True, 50), repeat))
+
+        new_notes = [Note(f"Новая заметка {i}", "Текст для замера") for i in range(repeat)]
+        record("save_new", sum(best_time(lambda n=n: storage.save(n), 1) for n in new_notes) / repeat)
+        target = storage.get(size // 2)
+        target.title += " (изменено)"
+        record("update", best_time(lambda: storage.save(target), repeat))
+        victims = iter(range(1, repeat + 1))
+        record("delete", sum(best_time(lambda: storage.delete(next(victims)), 1)
+                             for _ in range(repeat)) / repeat)
+        storage.close()
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+    return results
+
+
+def environment() -> Dict:
+    """Описывает окружение прогона для сравнения результатов.
+
+    Returns:
+        Dict: Коммит, версия Python, платформа и время запуска
+    """
+    try:
+        commit = subprocess.run(["git", "rev-parse", "HEAD"], capture_output=True,
+                                text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+    return {
+        "commit": commit,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "started_at": datetime.now().isoformat(),
+    }
+
+
+def main(argv=None):
+    """Разбирает аргументы и запускает замеры."""
+    parser = argparse.ArgumentParser(description="Замеры хранилища заметок")
+    parser.add_argument("--sizes", type=int, nargs="+", default=list(DEFAULT_SIZES),
+                        help="объемы корпуса (например 1000 10000 100000 1000000)")
+    parser.add_argument("--backends", nargs="+", default=["json"], choices=sorted(BACKENDS))
+    parser.add_argument("--repeat", type=int, default=5, help="повторы быстрых операций")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--out", default="bench_results.json", help="файл результатов")
+    args = parser.parse_args(argv)
+
+    results = []
+    corpus_dir = tempfile.mkdtemp(prefix="bench_corpus_")
+    try:
+        for size in args.sizes:
+            corpus_path = os.path.join(corpus_dir, f"notes_{size}.json")
+            write_corpus(corpus_path, size, args.seed)
+            for backend in args.backends:
+                results.extend(bench_backend(backend, size, corpus_path, args.repeat))
+    finally:
+        shutil.rmtree(corpus_dir, ignore_errors=True)
+
+    with open(args.out, 'w', encoding='utf-8') as f:
+        json.dump({"environment": environment(), "seed": args.seed, "results": results},
+                  f, ensure_ascii=False, indent=2)
+    print(f"Результаты записаны в {args.out}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
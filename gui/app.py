@@ -2,11 +2,19 @@
 Модуль app - графический интерфейс приложения "Менеджер заметок".
 
 Содержит класс NoteApp с Tkinter интерфейсом для управления заметками.
+Изменения, сделанные другим процессом (вторым окном или командной
+строкой), подхватываются периодической проверкой хранилища.
 """
 
 import tkinter as tk
 from tkinter import ttk, messagebox, scrolledtext
-from notebook import Storage, Note
+from typing import Optional
+from notebook import Note, open_storage
+from notebook.profiling import PROFILER, BUCKET_LABELS, timed
+from notebook.query import sort_key
+from gui.virtual_table import VirtualTable, ROW_HEIGHT
+from gui.worker import StorageWorker
+from gui.search_session import SearchSession
 
 # === РОЗОВАЯ ТЕМА ===
 BG_COLOR = "#FFF0F5"
@@ -15,6 +23,15 @@ DARK_PINK = "#FF69B4"
 WHITE = "#FFFFFF"
 TEXT_COLOR = "#333333"
 
+PRIORITY_LABELS = {"low": "Низкий", "medium": "Средний", "high": "Высокий"}
+STATUS_LABELS = {"active": "В работе", "done": "Готово", "archived": "Архив"}
+# Пауза ввода в строке поиска, после которой выполняется поиск
+SEARCH_DELAY_MS = 150
+# Период проверки хранилища на изменения другими процессами
+WATCH_MS = 1000
+# Колонки таблицы, сортируемые щелчком по заголовку → поле сортировки
+SORT_COLUMNS = {"id": "id", "title": "title", "priority": "priority", "status": "status", "date": "created"}
+
 
 class NoteApp:
     """Главный класс графического приложения для управления заметками.
@@ -24,27 +41,46 @@ class NoteApp:
         storage (Storage): Объект для работы с хранилищем
         priority_buttons (dict): Кнопки выбора приоритета
         status_buttons (dict): Кнопки выбора статуса
+        table (VirtualTable): Таблица заметок с отрисовкой видимого окна
+        worker (StorageWorker): Фоновый поток для операций с хранилищем
+        search_session (SearchSession): Поиск по мере ввода с кэшем результатов
+        sort_column (Optional[str]): Колонка сортировки или None для порядка хранения
+        sort_descending (bool): Сортировка по убыванию
     """
 
-    def __init__(self, root):
+    def __init__(self, root, storage=None):
         """Инициализирует приложение.
 
         Args:
             root (tk.Tk): Корневое окно Tkinter
+            storage (Storage, optional): Хранилище заметок; по умолчанию
+                выбирается через open_storage() по переменным окружения
         """
         self.root = root
         self.root.title("Менеджер заметок — #хэштеги")
         self.root.geometry("950x650")
         self.root.minsize(850, 550)
         self.root.configure(bg=BG_COLOR)
-        self.storage = Storage()
+        self.storage = storage if storage is not None else open_storage()
+        self.worker = StorageWorker(root, on_busy=self.set_busy, on_error=self.show_error)
+        self.search_session = SearchSession(self.storage)
+        # Отложенный поиск и текст, по которому он последний раз запускался
+        self._search_after = None
+        self._search_text = ""
+        # Версия хранилища, по которой последний раз загружалась таблица
+        self._seen_generation = None
+        self._watch_after = None
+        self.sort_column = None
+        self.sort_descending = False
 
         self.priority_buttons = {}
         self.status_buttons = {}
 
         self.setup_styles()
         self.setup_ui()
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         self.refresh_notes()
+        self._watch_after = self.root.after(WATCH_MS, self.watch_storage)
 
     def setup_styles(self):
         """Настраивает стили для Tkinter виджетов."""
@@ -72,7 +108,7 @@ class NoteApp:
                         background=WHITE,
                         fieldbackground=WHITE,
                         font=('Segoe UI', 10),
-                        rowheight=28)
+                        rowheight=ROW_HEIGHT)
         style.configure('Treeview.Heading',
                         background=PINK,
                         foreground=TEXT_COLOR,
@@ -150,24 +186,28 @@ class NoteApp:
             side=tk.LEFT)
         self.search_entry = ttk.Entry(search_frame, font=('Segoe UI', 11))
         self.search_entry.pack(side=tk.LEFT, fill=tk.X, expand=True, padx=5)
-        self.search_entry.bind("<KeyRelease>", lambda e: self.refresh_notes())
+        self.search_entry.bind("<KeyRelease>", self.on_search_key)
         clear_btn = tk.Button(search_frame, text="Очистить", bg=DARK_PINK, fg="white", font=('Segoe UI', 9, 'bold'),
                               relief='flat',
                               command=lambda: self.search_entry.delete(0, tk.END) or self.refresh_notes())
         clear_btn.pack(side=tk.RIGHT)
 
-        # Таблица
+        # Таблица (создает строки только для видимой части списка)
         columns = ("id", "title", "tags", "priority", "status", "date")
-        self.tree = ttk.Treeview(list_frame, columns=columns, show="headings", style='Treeview')
         widths = [50, 280, 180, 90, 90, 100]
         texts = ["ID", "Заголовок", "Хэштеги", "Приоритет", "Статус", "Дата"]
-        for col, text, width in zip(columns, texts, widths):
-            self.tree.heading(col, text=text)
-            self.tree.column(col, width=width, anchor="w")
-        self.tree.pack(fill=tk.BOTH, expand=True)
+        self.table = VirtualTable(list_frame, columns, texts, widths, self.note_row)
+        self.table.frame.pack(fill=tk.BOTH, expand=True)
+        self.tree = self.table.tree
+        self.column_texts = dict(zip(columns, texts))
+        for col in SORT_COLUMNS:
+            self.tree.heading(col, command=lambda c=col: self.sort_by(c))
 
         self.tree.bind("<Double-1>", self.show_details)
         self.tree.bind("<Delete>", self.delete_selected)
+        if PROFILER.enabled:
+            # Скрытое окно статистики замеров
+            self.root.bind("<F12>", self.show_stats)
 
         # Кнопки
         btn_frame = ttk.Frame(list_frame)
@@ -176,6 +216,10 @@ class NoteApp:
             side=tk.LEFT, padx=5)
         ttk.Button(btn_frame, text="Обновить список", style='Pink.TButton', command=self.refresh_notes).pack(
             side=tk.LEFT)
+        self.count_label = ttk.Label(btn_frame, text="", background=BG_COLOR, foreground="gray")
+        self.count_label.pack(side=tk.LEFT, padx=10)
+        self.busy_label = ttk.Label(btn_frame, text="", background=BG_COLOR, foreground=DARK_PINK)
+        self.busy_label.pack(side=tk.LEFT)
 
     def select_priority(self, value: str):
         """Выбирает приоритет заметки.
@@ -215,7 +259,16 @@ class NoteApp:
             status=self.status_var.get(),
             tags=tags
         )
-        if self.storage.save(note):
+        self.worker.submit(self.storage.save, note, callback=lambda ok: self.on_note_saved(note, ok))
+
+    def on_note_saved(self, note: Note, ok: bool):
+        """Обрабатывает результат сохранения новой заметки.
+
+        Args:
+            note (Note): Сохраненная заметка
+            ok (bool): Успешно ли сохранение
+        """
+        if ok:
             messagebox.showinfo("Готово!", f"Заметка добавлена (ID: {note.id})")
             self.clear_form()
             self.refresh_notes()
@@ -230,47 +283,170 @@ class NoteApp:
         self.select_priority("medium")
         self.select_status("active")
 
+    @staticmethod
+    def note_row(note: Note) -> tuple:
+        """Формирует значения строки таблицы для заметки.
+
+        Args:
+            note (Note): Объект заметки
+
+        Returns:
+            tuple: Значения колонок таблицы
+        """
+        tags_str = ", ".join([f"#{t}" for t in note.tags]) if note.tags else "—"
+        return (note.id, note.title, tags_str, PRIORITY_LABELS[note.priority],
+                STATUS_LABELS[note.status], note.created_at[:10])
+
+    def on_search_key(self, event=None):
+        """Откладывает поиск до паузы в наборе.
+
+        Клавиши, не меняющие текст (стрелки, Shift и т. п.), поиск не запускают.
+
+        Args:
+            event: Событие отпускания клавиши в строке поиска (опционально)
+        """
+        if self.search_entry.get() == self._search_text and self._search_after is None:
+            return
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        self._search_after = self.root.after(SEARCH_DELAY_MS, self.refresh_notes)
+
+    @timed()
     def refresh_notes(self):
-        """Обновляет список заметок в таблице с учетом поискового запроса."""
-        for item in self.tree.get_children():
-            self.tree.delete(item)
-
-        search = self.search_entry.get().lower().lstrip('#')
-        notes = self.storage.get_all()
-
-        for note in notes:
-            tags_str = ", ".join([f"#{t}" for t in note.tags]) if note.tags else "—"
-            priority_text = {"low": "Низкий", "medium": "Средний", "high": "Высокий"}[note.priority]
-            status_text = {"active": "В работе", "done": "Готово", "archived": "Архив"}[note.status]
-
-            # Поиск по заголовку, содержимому или тегам
-            if search:
-                if (search in note.title.lower() or
-                        search in note.content.lower() or
-                        search in " ".join(note.tags)):
-                    self.tree.insert("", tk.END, values=(
-                        note.id, note.title, tags_str, priority_text, status_text, note.created_at[:10]
-                    ))
-            else:
-                self.tree.insert("", tk.END, values=(
-                    note.id, note.title, tags_str, priority_text, status_text, note.created_at[:10]
-                ))
+        """Обновляет список заметок в таблице с учетом поискового запроса.
+
+        Таблица не перестраивается целиком: в виджете обновляется только
+        видимое окно строк. Выделение и позиция прокрутки сохраняются.
+        """
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+            self._search_after = None
+        self._search_text = self.search_entry.get()
+        # Новый запрос вытесняет еще не выполненный предыдущий
+        field = SORT_COLUMNS.get(self.sort_column)
+        self.worker.submit(self.load_notes, self._search_text, field, self.sort_descending,
+                           callback=self.show_notes, key="refresh")
+
+    def sort_by(self, column: str):
+        """Сортирует таблицу по колонке; повторный щелчок меняет направление.
+
+        Args:
+            column (str): Идентификатор колонки из SORT_COLUMNS
+        """
+        if column == self.sort_column:
+            self.sort_descending = not self.sort_descending
+        else:
+            if self.sort_column is not None:
+                self.tree.heading(self.sort_column, text=self.column_texts[self.sort_column])
+            self.sort_column = column
+            self.sort_descending = False
+        arrow = " ▼" if self.sort_descending else " ▲"
+        self.tree.heading(column, text=self.column_texts[column] + arrow)
+        self.table.offset = 0
+        self.refresh_notes()
+
+    @timed()
+    def load_notes(self, search: str, sort_field=None, descending: bool = False) -> list:
+        """Загружает заметки для таблицы (выполняется в фоновом потоке).
+
+        Args:
+            search (str): Поисковый запрос
+            sort_field (str, optional): Поле сортировки или None для порядка хранения
+            descending (bool, optional): Сортировка по убыванию. Defaults to False.
+
+        Returns:
+            List[Note]: Найденные заметки
+        """
+        self._seen_generation = self.storage.generation
+        # Поиск по заголовку, содержимому или тегам через индекс хранилища;
+        # результаты недавних запросов берутся из кэша сессии
+        if search.strip(' #'):
+            notes = self.search_session.search(search)
+            if sort_field is not None:
+                # Сортируются только найденные заметки, а не все хранилище
+                notes = sorted(notes, key=sort_key(sort_field), reverse=descending)
+            return notes
+        if sort_field is not None:
+            # Порядок поддерживается хранилищем и не строится заново
+            return self.storage.order_by(sort_field, descending)
+        return self.storage.get_all()
+
+    def watch_storage(self):
+        """Проверяет в фоновом потоке, не изменилось ли хранилище.
+
+        Проверка дешевая: для файла сравнивается его отпечаток (stat),
+        для SQLite — номер версии базы; перечитывается только изменившееся.
+        """
+        self._watch_after = None
+        self.worker.submit(self.check_storage, callback=self.on_storage_checked,
+                           key="watch", background=True)
+
+    def check_storage(self) -> Optional[int]:
+        """Возвращает версию хранилища (выполняется в фоновом потоке).
+
+        Returns:
+            Optional[int]: Текущая версия или None, если проверка не удалась
+        """
+        try:
+            return self.storage.generation
+        except Exception as e:
+            # Сбой одной проверки (например, файл как раз заменяется)
+            # не должен останавливать наблюдение за хранилищем
+            print(f"Ошибка проверки хранилища: {e}")
+            return None
+
+    def on_storage_checked(self, generation: Optional[int]):
+        """Обновляет таблицу, если хранилище изменилось, и планирует следующую проверку.
 
+        Args:
+            generation (Optional[int]): Текущая версия хранилища или None
+        """
+        if generation is not None and generation != self._seen_generation:
+            self.refresh_notes()
+        self._watch_after = self.root.after(WATCH_MS, self.watch_storage)
+
+    @timed()
+    def show_notes(self, notes: list):
+        """Показывает загруженные заметки в таблице.
+
+        Args:
+            notes (List[Note]): Заметки в порядке отображения
+        """
+        self.table.set_notes(notes)
+        self.count_label.configure(text=f"Всего: {len(notes)}")
+
+    @timed()
     def show_details(self, event=None):
         """Показывает детали выбранной заметки.
 
         Args:
             event: Событие двойного клика (опционально)
         """
-        selected = self.tree.selection()
+        if event is not None and self.tree.identify_region(event.x, event.y) == "heading":
+            return  # Двойной щелчок по заголовку — это смена сортировки
+        selected = self.table.selection_ids()
         if not selected:
             return
-        item = self.tree.item(selected[0])
-        note_id = int(item["values"][0])
-        note = next((n for n in self.storage.get_all() if n.id == note_id), None)
-        if note:
-            self.open_detail_window(note)
+        note_id = selected[0]
+        self.worker.submit(self.load_note, note_id,
+                           callback=lambda note: note and self.open_detail_window(note))
+
+    @timed()
+    def load_note(self, note_id: int):
+        """Загружает заметку с содержанием (выполняется в фоновом потоке).
 
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Note]: Заметка или None, если она не найдена
+        """
+        note = self.storage.get(note_id)
+        if note is not None:
+            note.content  # Ленивое содержание читается здесь, а не в потоке Tk
+        return note
+
+    @timed()
     def open_detail_window(self, note: Note):
         """Открывает окно с деталями заметки.
 
@@ -300,19 +476,104 @@ class NoteApp:
         text.config(state=tk.DISABLED)
 
     def delete_selected(self, event=None):
-        """Удаляет выбранную заметку.
+        """Удаляет выбранные заметки одной записью в хранилище.
 
         Args:
             event: Событие нажатия клавиши Delete (опционально)
         """
-        selected = self.tree.selection()
+        selected = self.table.selection_ids()
         if not selected:
             messagebox.showwarning("Выберите", "Выберите заметку для удаления")
             return
-        if messagebox.askyesno("Удалить?", "Удалить выбранную заметку?"):
-            note_id = int(self.tree.item(selected[0], "values")[0])
-            if self.storage.delete(note_id):
-                self.refresh_notes()
-                messagebox.showinfo("Удалено", f"Заметка ID {note_id} удалена")
+        question = "Удалить выбранную заметку?" if len(selected) == 1 else \
+            f"Удалить выбранные заметки ({len(selected)})?"
+        if messagebox.askyesno("Удалить?", question):
+            self.worker.submit(self.storage.delete_many, selected,
+                               callback=lambda results: self.on_notes_deleted(selected, results))
+
+    def on_notes_deleted(self, note_ids: list, results: list):
+        """Обрабатывает результат удаления заметок.
+
+        Args:
+            note_ids (List[int]): ID заметок, которые требовалось удалить
+            results (List[bool]): Результат для каждого ID
+        """
+        deleted = [i for i, ok in zip(note_ids, results) if ok]
+        if deleted:
+            self.refresh_notes()
+        if len(deleted) == len(note_ids):
+            if len(deleted) == 1:
+                messagebox.showinfo("Удалено", f"Заметка ID {deleted[0]} удалена")
             else:
-                messagebox.showerror("Ошибка", "Не удалось удалить")
\ No newline at end of file
+                messagebox.showinfo("Удалено", f"Удалено заметок: {len(deleted)}")
+        else:
+            messagebox.showerror("Ошибка", "Не удалось удалить")
+
+    def set_busy(self, busy: bool):
+        """Показывает или скрывает индикатор фоновой операции.
+
+        Args:
+            busy (bool): Выполняется ли операция с хранилищем
+        """
+        self.busy_label.configure(text="Загрузка…" if busy else "")
+        self.root.configure(cursor="watch" if busy else "")
+
+    def show_error(self, error: Exception):
+        """Сообщает об ошибке фоновой операции.
+
+        Args:
+            error (Exception): Исключение из фонового потока
+        """
+        messagebox.showerror("Ошибка", f"Ошибка хранилища: {error}")
+
+    def show_stats(self, event=None):
+        """Открывает окно со статистикой замеров.
+
+        Args:
+            event: Событие нажатия клавиши F12 (опционально)
+        """
+        win = tk.Toplevel(self.root)
+        win.title("Замеры")
+        win.geometry("900x400")
+        win.configure(bg=BG_COLOR)
+
+        columns = ("name", "count", "mean", "max", "total", "bytes") + BUCKET_LABELS
+        texts = ("Точка замера", "Вызовов", "Среднее, мс", "Макс., мс", "Всего, с", "Байт") + BUCKET_LABELS
+        tree = ttk.Treeview(win, columns=columns, show="headings")
+        for col, text in zip(columns, texts):
+            tree.heading(col, text=text)
+            tree.column(col, width=220 if col == "name" else 70, anchor="w" if col == "name" else "e")
+        tree.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
+
+        def fill():
+            tree.delete(*tree.get_children())
+            for row in PROFILER.snapshot():
+                tree.insert("", tk.END, values=(row["name"], row["count"], row["mean_ms"], row["max_ms"],
+                                                row["total_s"], row["bytes"], *row["histogram"].values()))
+
+        def save():
+            path = PROFILER.dump()
+            if path:
+                messagebox.showinfo("Замеры", f"Отчет сохранен: {path}", parent=win)
+
+        btn_frame = ttk.Frame(win)
+        btn_frame.pack(pady=(0, 10))
+        ttk.Button(btn_frame, text="Обновить", style='Pink.TButton', command=fill).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Сбросить", style='Pink.TButton',
+                   command=lambda: PROFILER.reset() or fill()).pack(side=tk.LEFT, padx=5)
+        ttk.Button(btn_frame, text="Сохранить отчет", style='Pink.TButton', command=save).pack(side=tk.LEFT)
+        fill()
+
+    def on_close(self):
+        """Дожидается фоновых операций, записывает изменения и закрывает приложение."""
+        if self._search_after is not None:
+            self.root.after_cancel(self._search_after)
+        if self._watch_after is not None:
+            self.root.after_cancel(self._watch_after)
+        self.worker.shutdown()
+        # При отложенной записи часть изменений может быть еще только в памяти
+        while not self.storage.flush():
+            if not messagebox.askretrycancel("Ошибка", "Не удалось записать изменения на диск. Повторить?"):
+                break
+        self.storage.close()
+        self.root.destroy()
\ No newline at end of file
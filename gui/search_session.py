@@ -0,0 +1,133 @@
+"""
+Модуль search_session - поиск по мере ввода с кэшем результатов.
+
+Сессия запоминает результаты последних запросов (LRU) вместе с номером
+версии хранилища: любое изменение заметок делает кэш недействительным.
+Если новый запрос уточняет один из запомненных («раб» → «рабо»,
+«отчет» → «отчет #работа»), он может быть проверен только на заметках
+из прежнего результата, а не на всем хранилище. Уточнение выбирается,
+когда по замерам оно дешевле поиска в хранилище: для хранилища
+с индексом в памяти поиск и так быстр, а для SQLite каждый запрос
+заново читает и создает заметки.
+"""
+
+import time
+from collections import OrderedDict
+from typing import List, Optional, Tuple
+from notebook.search_index import parse_query, compile_terms
+from notebook.profiling import timed
+
+# Число запоминаемых запросов
+CACHE_SIZE = 64
+# Начальная оценка времени проверки одной заметки при уточнении, с
+REFINE_NOTE_COST = 1e-5
+
+_Terms = Tuple[Tuple[bool, str, bool], ...]
+
+
+def narrows(old: _Terms, new: _Terms) -> bool:
+    """Проверяет, что результат нового запроса входит в результат старого.
+
+    Каждое условие старого запроса должно следовать из какого-либо
+    условия нового: префикс — из слова с тем же началом, точное
+    слово — из того же точного слова.
+
+    Args:
+        old (_Terms): Условия запомненного запроса (parse_query)
+        new (_Terms): Условия нового запроса
+
+    Returns:
+        bool: True, если новый запрос уточняет старый
+    """
+    for is_tag, term, is_prefix in old:
+        if is_prefix:
+            implied = any(t == is_tag and w.startswith(term) for t, w, _ in new)
+        else:
+            implied = (is_tag, term, False) in new
+        if not implied:
+            return False
+    return True
+
+
+class SearchSession:
+    """Поиск по мере ввода поверх хранилища.
+
+    Attributes:
+        storage (Storage): Хранилище заметок
+        size (int): Число запоминаемых запросов
+    """
+
+    def __init__(self, storage, size: int = CACHE_SIZE):
+        """Создает сессию с пустым кэшем.
+
+        Args:
+            storage (Storage): Хранилище с методом search() и свойством generation
+            size (int, optional): Число запоминаемых запросов. Defaults to CACHE_SIZE.
+        """
+        self.storage = storage
+        self.size = size
+        # Условия запроса → найденные заметки в порядке возрастания ID
+        self._results: "OrderedDict[_Terms, List]" = OrderedDict()
+        self._generation: Optional[int] = None
+        # Замеренное время поиска в хранилище и проверки одной заметки
+        self._search_cost: Optional[float] = None
+        self._refine_cost = REFINE_NOTE_COST
+
+    def clear(self):
+        """Очищает кэш результатов."""
+        self._results.clear()
+
+    @timed()
+    def search(self, query: str) -> List:
+        """Ищет заметки, используя запомненные результаты.
+
+        Args:
+            query (str): Поисковый запрос, как в Storage.search()
+
+        Returns:
+            List[Note]: Найденные заметки в порядке возрастания ID
+        """
+        generation = self.storage.generation
+        if generation != self._generation:
+            self._results.clear()
+            self._generation = generation
+        # Запросы, отличающиеся регистром или пробелами, дают одни условия
+        terms = tuple(parse_query(query))
+        if not terms:
+            return []
+        notes = self._results.get(terms)
+        if notes is not None:
+            self._results.move_to_end(terms)
+            return notes
+        base = self._refinable(terms)
+        start = time.perf_counter()
+        if base is not None:
+            matches = compile_terms(terms)
+            notes = [note for note in base if matches(note)]
+            self._refine_cost = (time.perf_counter() - start) / len(base)
+        else:
+            notes = self.storage.search(query)
+            self._search_cost = time.perf_counter() - start
+        self._results[terms] = notes
+        if len(self._results) > self.size:
+            self._results.popitem(last=False)
+        return notes
+
+    def _refinable(self, terms: _Terms) -> Optional[List]:
+        """Возвращает наименьший запомненный результат, который уточняет запрос.
+
+        Args:
+            terms (_Terms): Условия нового запроса
+
+        Returns:
+            Optional[List[Note]]: Заметки для проверки или None, если
+                подходящего результата нет или поиск в хранилище дешевле
+        """
+        best = None
+        for old, notes in self._results.items():
+            if notes and (best is None or len(notes) < len(best)) and narrows(old, terms):
+                best = notes
+        if best is not None and self._search_cost is not None \
+                and len(best) * self._refine_cost >= self._search_cost:
+            return None
+        return best
@@ -0,0 +1,229 @@
+"""
+Модуль virtual_table - виртуальная таблица заметок.
+
+Treeview содержит строки только для видимого окна результатов
+(плюс небольшой запас), остальные подгружаются из списка при прокрутке.
+Стоимость отрисовки зависит от высоты окна, а не от числа заметок.
+"""
+
+import tkinter as tk
+from tkinter import ttk
+from typing import Callable, List, Sequence
+from notebook.profiling import timed
+
+ROW_HEIGHT = 28
+# Высота строки заголовков таблицы в пикселях
+HEADING_HEIGHT = 30
+# Строки сверх видимых — частично видимая нижняя строка
+BUFFER_ROWS = 2
+WHEEL_ROWS = 3
+
+
+class VirtualTable:
+    """Таблица с отрисовкой только видимого окна строк.
+
+    Attributes:
+        frame (ttk.Frame): Контейнер таблицы и полосы прокрутки
+        tree (ttk.Treeview): Виджет таблицы
+        notes (list): Полный список отображаемых заметок
+        offset (int): Индекс первой видимой заметки
+        visible (int): Число строк, помещающихся в окне
+    """
+
+    def __init__(self, parent, columns: Sequence[str], texts: Sequence[str],
+                 widths: Sequence[int], row_func: Callable):
+        """Создает таблицу.
+
+        Args:
+            parent: Родительский виджет
+            columns (Sequence[str]): Идентификаторы колонок
+            texts (Sequence[str]): Заголовки колонок
+            widths (Sequence[int]): Ширины колонок
+            row_func (Callable): Функция заметка → значения строки
+        """
+        self.frame = ttk.Frame(parent)
+        self.tree = ttk.Treeview(self.frame, columns=columns, show="headings", style='Treeview')
+        for col, text, width in zip(columns, texts, widths):
+            self.tree.heading(col, text=text)
+            self.tree.column(col, width=width, anchor="w")
+        self.scrollbar = ttk.Scrollbar(self.frame, orient=tk.VERTICAL, command=self.on_scrollbar)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.tree.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+
+        self.row_func = row_func
+        self.notes = []
+        self.offset = 0
+        self.visible = 10
+        # Строки окна: ID заметки → ID элемента Treeview и его значения
+        self.tree_rows = {}
+        self.row_values = {}
+        self.row_order = []
+        # Выделенные заметки, в том числе ушедшие за пределы окна
+        self.selected_ids = set()
+
+        self.tree.bind("<Configure>", self.on_resize)
+        self.tree.bind("<MouseWheel>", self.on_wheel)
+        self.tree.bind("<Button-4>", lambda e: self.scroll_by(-WHEEL_ROWS) or "break")
+        self.tree.bind("<Button-5>", lambda e: self.scroll_by(WHEEL_ROWS) or "break")
+        self.tree.bind("<Button-1>", self.on_click, add=True)
+        self.tree.bind("<Up>", lambda e: self.move_selection(-1) or "break")
+        self.tree.bind("<Down>", lambda e: self.move_selection(1) or "break")
+        self.tree.bind("<Prior>", lambda e: self.move_selection(-self.visible) or "break")
+        self.tree.bind("<Next>", lambda e: self.move_selection(self.visible) or "break")
+        self.tree.bind("<Home>", lambda e: self.move_selection(-len(self.notes)) or "break")
+        self.tree.bind("<End>", lambda e: self.move_selection(len(self.notes)) or "break")
+
+    def set_notes(self, notes: List):
+        """Задает полный список заметок и перерисовывает окно.
+
+        Args:
+            notes (List[Note]): Заметки в порядке отображения
+        """
+        self.stash_selection()
+        # Удаленные и скрытые фильтром заметки не остаются выделенными
+        self.selected_ids &= {note.id for note in notes}
+        self.notes = notes
+        self.render()
+
+    def render(self):
+        """Отрисовывает видимое окно строк начиная с offset."""
+        total = len(self.notes)
+        self.offset = max(0, min(self.offset, total - self.visible))
+        self.apply_rows(self.notes[self.offset:self.offset + self.visible + BUFFER_ROWS])
+        items = [self.tree_rows[i] for i in self.row_order if i in self.selected_ids]
+        self.tree.selection_set(items)
+        self.tree.yview_moveto(0)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    @timed()
+    def apply_rows(self, notes):
+        """Приводит строки таблицы к заданному списку заметок.
+
+        Удаляются исчезнувшие строки, добавляются новые и обновляются
+        изменившиеся; строки переставляются, только если сменился порядок.
+
+        Args:
+            notes (List[Note]): Заметки окна в порядке отображения
+        """
+        new_ids = [note.id for note in notes]
+        new_set = set(new_ids)
+
+        for note_id in [i for i in self.tree_rows if i not in new_set]:
+            self.tree.delete(self.tree_rows.pop(note_id))
+            del self.row_values[note_id]
+
+        kept = [i for i in self.row_order if i in new_set]
+        kept_set = set(kept)
+        for index, note in enumerate(notes):
+            values = self.row_func(note)
+            item = self.tree_rows.get(note.id)
+            if item is None:
+                self.tree_rows[note.id] = self.tree.insert("", index, values=values)
+            elif self.row_values[note.id] != values:
+                self.tree.item(item, values=values)
+            self.row_values[note.id] = values
+
+        # Строки, сменившие порядок (например, после редактирования), переставляем
+        if kept != [i for i in new_ids if i in kept_set]:
+            for index, note_id in enumerate(new_ids):
+                self.tree.move(self.tree_rows[note_id], "", index)
+        self.row_order = new_ids
+
+    def stash_selection(self):
+        """Запоминает выделение окна перед сменой видимых строк."""
+        window = set(self.row_order)
+        items = {item: note_id for note_id, item in self.tree_rows.items()}
+        selected = {items[item] for item in self.tree.selection() if item in items}
+        self.selected_ids = selected | (self.selected_ids - window)
+
+    def selection_ids(self) -> List[int]:
+        """Возвращает ID выделенных заметок.
+
+        Returns:
+            List[int]: ID заметок в порядке отображения в окне, затем остальные
+        """
+        self.stash_selection()
+        in_window = [i for i in self.row_order if i in self.selected_ids]
+        return in_window + sorted(self.selected_ids - set(in_window))
+
+    def scroll_to(self, offset: int):
+        """Прокручивает таблицу так, чтобы offset был первой строкой.
+
+        Args:
+            offset (int): Индекс первой видимой заметки
+        """
+        offset = max(0, min(offset, len(self.notes) - self.visible))
+        if offset != self.offset:
+            self.stash_selection()
+            self.offset = offset
+            self.render()
+
+    def scroll_by(self, rows: int):
+        """Прокручивает таблицу на заданное число строк.
+
+        Args:
+            rows (int): Смещение (отрицательное — вверх)
+        """
+        self.scroll_to(self.offset + rows)
+
+    def move_selection(self, step: int):
+        """Перемещает выделение на step строк, прокручивая окно при выходе за край.
+
+        Args:
+            step (int): Смещение выделения
+        """
+        if not self.notes:
+            return
+        focus = self.tree.focus()
+        index = self.row_order.index(self._item_note(focus)) if focus in self.tree_rows.values() else 0
+        target = max(0, min(self.offset + index + step, len(self.notes) - 1))
+        if target < self.offset:
+            self.scroll_to(target)
+        elif target >= self.offset + self.visible:
+            self.scroll_to(target - self.visible + 1)
+        note_id = self.notes[target].id
+        self.selected_ids = {note_id}
+        item = self.tree_rows[note_id]
+        self.tree.selection_set(item)
+        self.tree.focus(item)
+
+    def _item_note(self, item: str) -> int:
+        """Возвращает ID заметки для элемента Treeview."""
+        return next(i for i, it in self.tree_rows.items() if it == item)
+
+    def on_scrollbar(self, action: str, value, units: str = None):
+        """Обрабатывает команды полосы прокрутки.
+
+        Args:
+            action (str): "moveto" или "scroll"
+            value: Доля списка для moveto либо число шагов для scroll
+            units (str, optional): "units" или "pages" для scroll
+        """
+        if action == "moveto":
+            self.scroll_to(int(float(value) * len(self.notes)))
+        elif action == "scroll":
+            step = self.visible if units == "pages" else 1
+            self.scroll_by(int(value) * step)
+
+    def on_wheel(self, event):
+        """Прокручивает таблицу колесом мыши (Windows/macOS)."""
+        self.scroll_by(-WHEEL_ROWS if event.delta > 0 else WHEEL_ROWS)
+        return "break"
+
+    def on_click(self, event):
+        """Сбрасывает выделение за пределами окна при обычном щелчке."""
+        if self.tree.identify_region(event.x, event.y) == "heading":
+            return  # Щелчок по заголовку колонки меняет сортировку, а не выделение
+        if not event.state & 0x0005:  # без Shift и Control
+            self.selected_ids.clear()
+
+    def on_resize(self, event):
+        """Пересчитывает число видимых строк при изменении размера."""
+        visible = max(1, (event.height - HEADING_HEIGHT) // ROW_HEIGHT)
+        if visible != self.visible:
+            self.stash_selection()
+            self.visible = visible
+            self.render()
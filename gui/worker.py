@@ -0,0 +1,111 @@
+"""
+Модуль worker - выполнение операций с хранилищем вне потока Tk.
+
+Все обращения к Storage выполняются по очереди в одном фоновом потоке,
+а результаты возвращаются в главный поток опросом через root.after.
+Устаревшие запросы (например, поиск, который уже перебит новым вводом)
+отменяются или их результаты отбрасываются.
+"""
+
+from concurrent.futures import ThreadPoolExecutor, Future
+from typing import Callable, Dict, List, Optional, Tuple
+
+POLL_MS = 30
+
+
+class StorageWorker:
+    """Очередь операций с хранилищем, выполняемых в фоновом потоке.
+
+    Attributes:
+        root (tk.Tk): Корневое окно для опроса результатов
+        on_busy (Callable): Вызывается с True/False при смене состояния занятости
+        on_error (Callable): Вызывается с исключением, если операция упала
+    """
+
+    def __init__(self, root, on_busy: Optional[Callable] = None,
+                 on_error: Optional[Callable] = None):
+        """Создает фоновый поток для операций с хранилищем.
+
+        Args:
+            root (tk.Tk): Корневое окно Tkinter
+            on_busy (Callable, optional): Обработчик смены состояния занятости
+            on_error (Callable, optional): Обработчик ошибок операций
+        """
+        self.root = root
+        self.on_busy = on_busy
+        self.on_error = on_error
+        # Один поток — операции с хранилищем не выполняются параллельно
+        self._executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="storage")
+        self._pending: List[Tuple[Future, Optional[Callable], Optional[str], bool]] = []
+        self._latest: Dict[str, Future] = {}
+        self._poll_id = None
+        self._busy = False
+
+    def submit(self, func: Callable, *args, callback: Optional[Callable] = None,
+               key: Optional[str] = None, background: bool = False) -> Future:
+        """Ставит операцию в очередь.
+
+        Args:
+            func (Callable): Функция, выполняемая в фоновом потоке
+            *args: Аргументы функции
+            callback (Callable, optional): Вызывается в потоке Tk с результатом
+            key (str, optional): Ключ вытеснения — более новая операция
+                с тем же ключом отменяет предыдущую
+            background (bool, optional): Фоновая операция (например, проверка
+                изменений) не включает состояние занятости. Defaults to False.
+
+        Returns:
+            Future: Объект будущего результата
+        """
+        if key is not None and key in self._latest:
+            self._latest[key].cancel()
+        future = self._executor.submit(func, *args)
+        if key is not None:
+            self._latest[key] = future
+        self._pending.append((future, callback, key, background))
+        if not background:
+            self._set_busy(True)
+        if self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+        return future
+
+    def _poll(self):
+        """Доставляет готовые результаты в главный поток."""
+        self._poll_id = None
+        # Обработчики могут поставить новые операции — они попадут в свежий список
+        current, self._pending = self._pending, []
+        pending = []
+        for future, callback, key, background in current:
+            if not future.done():
+                pending.append((future, callback, key, background))
+                continue
+            if future.cancelled():
+                continue
+            if key is not None:
+                if self._latest.get(key) is not future:
+                    continue  # Результат устарел
+                del self._latest[key]
+            error = future.exception()
+            if error is not None:
+                if self.on_error is not None:
+                    self.on_error(error)
+            elif callback is not None:
+                callback(future.result())
+        self._pending = pending + self._pending
+        self._set_busy(any(not background for *_, background in self._pending))
+        if self._pending and self._poll_id is None:
+            self._poll_id = self.root.after(POLL_MS, self._poll)
+
+    def _set_busy(self, busy: bool):
+        """Сообщает о смене состояния занятости."""
+        if busy != self._busy:
+            self._busy = busy
+            if self.on_busy is not None:
+                self.on_busy(busy)
+
+    def shutdown(self):
+        """Дожидается завершения поставленных операций и останавливает поток."""
+        if self._poll_id is not None:
+            self.root.after_cancel(self._poll_id)
+            self._poll_id = None
+        self._executor.shutdown(wait=True)
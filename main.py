@@ -5,15 +5,44 @@
 Приложение позволяет создавать, просматривать, редактировать и удалять заметки
 с поддержкой тегов, приоритетов и статусов.
 
+Хранилище выбирается параметрами --backend и --file или переменными
+окружения ZAMETKI_BACKEND и ZAMETKI_PATH (json, journal, split, sharded,
+sqlite).
+Параметр --profile (или ZAMETKI_PROFILE) включает замеры: статистика
+открывается по F12 и записывается в отчет при выходе. Параметр
+--binary-snapshot ускоряет запуск хранилища json двоичным снимком,
+а --write-delay объединяет частые изменения в одну запись на диск.
+Для работы без графического интерфейса: python -m notebook --help;
+tkinter импортируется только при запуске окна.
+
 Attributes:
     root (tk.Tk): Корневое окно приложения
     app (NoteApp): Основной класс приложения
 """
 
-import tkinter as tk
-from gui.app import NoteApp
+import argparse
+from notebook import open_storage
+from notebook.backends import BACKENDS
+from notebook.profiling import PROFILER, DEFAULT_OUTPUT
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Менеджер заметок")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), help="тип хранилища")
+    parser.add_argument("--file", help="путь к файлу хранилища")
+    parser.add_argument("--profile", nargs="?", const=DEFAULT_OUTPUT, metavar="ОТЧЕТ",
+                        help="включить замеры и записать отчет (.json или .csv) при выходе")
+    parser.add_argument("--binary-snapshot", action="store_true", default=None,
+                        help="загружать заметки из двоичного снимка notes.bin (хранилище json)")
+    parser.add_argument("--write-delay", type=float, metavar="СЕК",
+                        help="откладывать запись на диск, объединяя изменения (хранилище json)")
+    args = parser.parse_args()
+    if args.profile:
+        PROFILER.enable(args.profile)
+
+    import tkinter as tk
+    from gui.app import NoteApp
+
     root = tk.Tk()
-    app = NoteApp(root)
+    app = NoteApp(root, open_storage(args.backend, args.file, args.binary_snapshot,
+                                           args.write_delay))
     root.mainloop()
\ No newline at end of file
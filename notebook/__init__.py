@@ -7,13 +7,51 @@
 Modules:
     models: Определение класса Note и методов работы с заметками
     storage: Класс для сохранения и загрузки заметок из JSON-файла
+    binary_snapshot: Двоичный снимок заметок для быстрого запуска
+    filelock: Межпроцессная блокировка записи в хранилище
+    journal: Журнальное хранилище с фоновым уплотнением
+    split_storage: Хранилище с ленивой загрузкой содержания заметок
+    sharded_storage: Хранилище, разделенное на шарды по ID или месяцу
+    reshard: Перераспределение заметок по шардам (python -m notebook.reshard)
+    sqlite_storage: Хранилище в базе SQLite с поиском FTS5
+    backends: Выбор хранилища по конфигурации
+    cli: Работа с заметками из командной строки (python -m notebook)
+    profiling: Встроенные замеры горячих путей (ZAMETKI_PROFILE)
 
 Classes:
     Note: Класс, представляющий заметку
     Storage: Класс для работы с хранилищем заметок
+    JournalStorage: Хранилище на основе снимка и журнала операций
+    SplitStorage: Хранилище с раздельными метаданными и содержанием
+    ShardedStorage: Хранилище с параллельной загрузкой шардов
+    SqliteStorage: Хранилище в базе SQLite
+
+Классы хранилищ, кроме Storage, импортируются при первом обращении,
+чтобы запуск из командной строки не загружал лишних модулей.
 """
 
+import importlib
 from .models import Note
 from .storage import Storage
+from .backends import open_storage
+
+# Класс → модуль пакета, из которого он импортируется при обращении
+_LAZY = {
+    "JournalStorage": "journal",
+    "SplitStorage": "split_storage",
+    "ShardedStorage": "sharded_storage",
+    "SqliteStorage": "sqlite_storage",
+}
+
+
+def __getattr__(name: str):
+    """Импортирует класс хранилища при первом обращении к нему."""
+    module = _LAZY.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module("." + module, __name__), name)
+    globals()[name] = value
+    return value
 
-__all__ = ["Note", "Storage"]
\ No newline at end of file
+__all__ = ["Note", "Storage", "JournalStorage", "SplitStorage", "ShardedStorage", "SqliteStorage",
+           "open_storage"]
\ No newline at end of file
@@ -0,0 +1,8 @@
+"""
+Запуск командной строки менеджера заметок: python -m notebook --help
+"""
+
+import sys
+from .cli import main
+
+sys.exit(main())
@@ -0,0 +1,85 @@
+"""
+Модуль backends - выбор хранилища заметок по конфигурации.
+
+Хранилище задается именем («json», «journal», «split», «sharded»,
+«sqlite») явно или через переменные окружения ZAMETKI_BACKEND
+и ZAMETKI_PATH. Для хранилища «json» переменная ZAMETKI_BINARY_SNAPSHOT=1
+включает двоичный снимок для быстрого запуска, а ZAMETKI_WRITE_DELAY
+(в секундах) — отложенную запись с объединением изменений.
+
+Модули хранилищ импортируются только при выборе, поэтому скрипты,
+работающие с notes.json, не загружают sqlite3 и multiprocessing.
+"""
+
+import importlib
+import os
+from typing import Optional
+from .storage import NOTES_FILE, DB_FILE
+
+# Имя хранилища → (модуль пакета notebook, класс)
+BACKENDS = {
+    "json": ("storage", "Storage"),
+    "journal": ("journal", "JournalStorage"),
+    "split": ("split_storage", "SplitStorage"),
+    "sharded": ("sharded_storage", "ShardedStorage"),
+    "sqlite": ("sqlite_storage", "SqliteStorage"),
+}
+DEFAULT_BACKEND = "json"
+# Путь по умолчанию для каждого хранилища
+DEFAULT_PATHS = {
+    "json": NOTES_FILE,
+    "journal": NOTES_FILE,
+    "split": NOTES_FILE,
+    "sharded": NOTES_FILE,
+    "sqlite": DB_FILE,
+}
+
+
+def backend_class(backend: str):
+    """Возвращает класс хранилища по имени, импортируя его модуль.
+
+    Args:
+        backend (str): Имя хранилища из BACKENDS
+
+    Returns:
+        type: Класс хранилища
+
+    Raises:
+        ValueError: Если имя хранилища неизвестно
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Неизвестное хранилище: {backend} (доступны: {', '.join(BACKENDS)})")
+    module, name = BACKENDS[backend]
+    return getattr(importlib.import_module("." + module, __package__), name)
+
+
+def open_storage(backend: Optional[str] = None, path: Optional[str] = None,
+                 binary_snapshot: Optional[bool] = None, write_delay: Optional[float] = None):
+    """Создает хранилище заметок выбранного типа.
+
+    Args:
+        backend (str, optional): Имя хранилища; по умолчанию берется из
+            ZAMETKI_BACKEND, а если она не задана — DEFAULT_BACKEND
+        path (str, optional): Путь к файлу хранилища; по умолчанию берется
+            из ZAMETKI_PATH или DEFAULT_PATHS
+        binary_snapshot (bool, optional): Использовать двоичный снимок
+            (только для «json»); по умолчанию берется из ZAMETKI_BINARY_SNAPSHOT
+        write_delay (float, optional): Задержка отложенной записи в секундах
+            (только для «json»); по умолчанию берется из ZAMETKI_WRITE_DELAY
+
+    Returns:
+        Storage: Объект хранилища с интерфейсом get_all/save/delete
+
+    Raises:
+        ValueError: Если имя хранилища неизвестно или задержка записи некорректна
+    """
+    backend = (backend or os.environ.get("ZAMETKI_BACKEND") or DEFAULT_BACKEND).lower()
+    storage_class = backend_class(backend)
+    path = path or os.environ.get("ZAMETKI_PATH") or DEFAULT_PATHS[backend]
+    if binary_snapshot is None:
+        binary_snapshot = os.environ.get("ZAMETKI_BINARY_SNAPSHOT") == "1"
+    if write_delay is None:
+        write_delay = float(os.environ.get("ZAMETKI_WRITE_DELAY") or 0)
+    if backend == "json":
+        return storage_class(path, binary_snapshot=binary_snapshot, write_delay=write_delay)
+    return storage_class(path)
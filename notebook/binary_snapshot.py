@@ -0,0 +1,199 @@
+"""
+Модуль binary_snapshot - двоичный снимок заметок для быстрого запуска.
+
+Снимок пишется рядом с notes.json (notes.bin) и хранит отпечаток файла,
+из которого он построен: если notes.json с тех пор изменился, снимок
+не используется и заметки читаются из JSON.
+
+Формат (little-endian):
+    Заголовок: HEADER — сигнатура, версия, отпечаток notes.json,
+        число заметок, строк в таблице, ссылок на теги и размеры блоков
+    Таблица строк: для каждой строки длина (uint32) и байты UTF-8;
+        содержит приоритеты, статусы, теги и нестандартные даты
+    Ссылки на теги: массив uint32 — индексы в таблице строк
+    Записи: RECORD фиксированной длины для каждой заметки
+    Заголовки: подряд одним блоком UTF-8, смещения — в символах
+    Содержание: подряд одним блоком UTF-8, смещения — в байтах
+
+Заголовки декодируются целиком при загрузке, а содержание читается
+из отображенного в память файла только при первом обращении
+к Note.content — как в SplitStorage.
+"""
+
+import gc
+import mmap
+import os
+import struct
+import sys
+from array import array
+from functools import partial
+from typing import Dict, Optional, Tuple
+from .models import Note
+
+MAGIC = b"ZMTK"
+VERSION = 1
+# Сигнатура, версия, отпечаток (mtime, размер, inode), число заметок,
+# строк, ссылок на теги и длины блоков заголовков и содержания в байтах
+HEADER = struct.Struct("<4sHxxqqqIIIQQ")
+# ID, смещение и длина заголовка, смещение и длина содержания, приоритет,
+# статус, первая ссылка на тег и число тегов, время создания в мкс,
+# индекс строки даты (NO_STRING, если дата хранится числом)
+RECORD = struct.Struct("<qQIQIIIIHqI")
+_LENGTH = struct.Struct("<I")
+NO_STRING = 0xFFFFFFFF
+
+
+def dump(notes, path: str, stamp: Tuple[int, int, int]) -> bool:
+    """Записывает двоичный снимок заметок.
+
+    Args:
+        notes (Iterable[Note]): Заметки в порядке хранения
+        path (str): Путь к файлу снимка
+        stamp (Tuple[int, int, int]): Отпечаток notes.json, которому
+            соответствуют заметки
+
+    Returns:
+        bool: True если запись успешна, иначе False
+    """
+    strings: Dict[str, int] = {}
+
+    def string_index(value: str) -> int:
+        index = strings.get(value)
+        if index is None:
+            index = strings[value] = len(strings)
+        return index
+
+    tag_refs = array('I')
+    records = bytearray()
+    titles = []
+    contents = []
+    title_chars = content_bytes = 0
+    count = 0
+    for note in notes:
+        title = note.title
+        content = note.peek_content().encode('utf-8')
+        created = note._created
+        created_str = NO_STRING
+        if isinstance(created, tuple):
+            # Дату не в формате ISO (например, null) снимок не хранит —
+            # заметки будут читаться из notes.json
+            return False
+        if isinstance(created, str):
+            created_str, created = string_index(created), 0
+        records += RECORD.pack(note.id, title_chars, len(title), content_bytes, len(content),
+                               string_index(note.priority), string_index(note.status),
+                               len(tag_refs), len(note.tags), created, created_str)
+        tag_refs.extend(string_index(tag) for tag in note.tags)
+        titles.append(title)
+        contents.append(content)
+        title_chars += len(title)
+        content_bytes += len(content)
+        count += 1
+    title_blob = "".join(titles).encode('utf-8')
+
+    tmp_path = path + ".tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, *stamp, count, len(strings), len(tag_refs),
+                                len(title_blob), content_bytes))
+            for value in strings:
+                data = value.encode('utf-8')
+                f.write(_LENGTH.pack(len(data)))
+                f.write(data)
+            f.write(tag_refs.tobytes())
+            f.write(records)
+            f.write(title_blob)
+            for content in contents:
+                f.write(content)
+        os.replace(tmp_path, path)
+        return True
+    except (PermissionError, OSError) as e:
+        print(f"Ошибка при записи двоичного снимка: {e}")
+        return False
+
+
+def load(path: str, stamp: Tuple[int, int, int]) -> Optional[Dict[int, Note]]:
+    """Загружает заметки из двоичного снимка, если он соответствует отпечатку.
+
+    Args:
+        path (str): Путь к файлу снимка
+        stamp (Tuple[int, int, int]): Текущий отпечаток notes.json
+
+    Returns:
+        Optional[Dict[int, Note]]: Заметки по ID или None, если снимка
+            нет, он устарел или поврежден
+    """
+    try:
+        with open(path, 'rb') as f:
+            # Отображение остается открытым, пока на него ссылаются
+            # функции чтения содержания у заметок
+            mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+    except (OSError, ValueError):
+        return None
+    try:
+        return _parse(mm, stamp)
+    except (ValueError, struct.error, UnicodeDecodeError, IndexError):
+        return None
+
+
+def _read_content(mm: mmap.mmap, start: int, end: int) -> str:
+    """Читает содержание одной заметки из снимка."""
+    return mm[start:end].decode('utf-8')
+
+
+def _parse(mm: mmap.mmap, stamp: Tuple[int, int, int]) -> Optional[Dict[int, Note]]:
+    """Разбирает отображенный в память снимок.
+
+    Args:
+        mm (mmap.mmap): Содержимое файла снимка
+        stamp (Tuple[int, int, int]): Текущий отпечаток notes.json
+
+    Returns:
+        Optional[Dict[int, Note]]: Заметки по ID или None, если снимок устарел
+    """
+    magic, version, mtime, size, inode, count, n_strings, n_refs, title_bytes, content_bytes = \
+        HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION or (mtime, size, inode) != tuple(stamp):
+        return None
+    pos = HEADER.size
+    strings = []
+    for _ in range(n_strings):
+        (length,) = _LENGTH.unpack_from(mm, pos)
+        pos += _LENGTH.size
+        strings.append(sys.intern(mm[pos:pos + length].decode('utf-8')))
+        pos += length
+    tag_refs = array('I')
+    tag_refs.frombytes(mm[pos:pos + 4 * n_refs])
+    tags_by_ref = [strings[i] for i in tag_refs]
+    pos += 4 * n_refs
+    records_end = pos + RECORD.size * count
+    # Заголовки декодируются одним вызовом, заметки получают срезы строки
+    titles = mm[records_end:records_end + title_bytes].decode('utf-8')
+    content_base = records_end + title_bytes
+    if content_base + content_bytes != len(mm):
+        return None
+
+    notes = {}
+    new = Note.__new__
+    # Заметки не образуют циклов ссылок, а сборщик мусора при массовом
+    # создании объектов срабатывает многократно и занимает большую часть времени
+    gc_enabled = gc.isenabled()
+    gc.disable()
+    try:
+        for (note_id, title_at, title_len, content_at, content_len, priority, status,
+             tag_at, tag_count, created, created_str) in RECORD.iter_unpack(mm[pos:records_end]):
+            note = new(Note)
+            note.id = note_id
+            note.title = titles[title_at:title_at + title_len]
+            start = content_base + content_at
+            note._content = ""
+            note._content_loader = partial(_read_content, mm, start, start + content_len)
+            note.priority = strings[priority]
+            note.status = strings[status]
+            note.tags = tags_by_ref[tag_at:tag_at + tag_count]
+            note._created = created if created_str == NO_STRING else strings[created_str]
+            notes[note_id] = note
+    finally:
+        if gc_enabled:
+            gc.enable()
+    return notes
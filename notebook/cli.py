@@ -0,0 +1,246 @@
+"""
+Модуль cli - работа с заметками из командной строки без графического интерфейса.
+
+Результаты выводятся построчно в формате JSON Lines, поэтому их можно
+передавать другим программам по мере получения. Команды add и delete без
+аргументов читают пакет со стандартного ввода: add — заметки в формате
+JSON Lines, delete — ID по одному в строке.
+
+Запуск:
+    python -m notebook list --tag работа --limit 10
+    python -m notebook list --sort priority --desc --limit 10
+    python -m notebook search "отчет #работа"
+    python -m notebook add --title "Купить хлеб" --tags дом
+    cat notes.jsonl | python -m notebook add
+    python -m notebook delete 3 7
+    python -m notebook export backup.jsonl
+
+Модуль tkinter и хранилища, кроме выбранного, не импортируются.
+"""
+
+import argparse
+import json
+import os
+import sys
+from typing import Iterable, Iterator, List, Optional
+from .models import Note, PRIORITIES, STATUSES
+from .query import SORT_FIELDS, sort_key
+from .storage import Storage
+from .backends import BACKENDS, open_storage
+
+
+def _emit(rows: Iterable[dict]) -> int:
+    """Печатает словари построчно в формате JSON Lines.
+
+    Args:
+        rows (Iterable[dict]): Выводимые строки
+
+    Returns:
+        int: Число напечатанных строк
+    """
+    count = 0
+    write = sys.stdout.write
+    for row in rows:
+        write(json.dumps(row, ensure_ascii=False) + "\n")
+        count += 1
+    sys.stdout.flush()
+    return count
+
+
+def _note_row(note: Note, content: bool = True) -> dict:
+    """Преобразует заметку в выводимый словарь.
+
+    Args:
+        note (Note): Заметка
+        content (bool, optional): Включать ли содержание. Defaults to True.
+
+    Returns:
+        dict: Данные заметки
+    """
+    row = note.to_dict()
+    if not content:
+        del row["content"]
+    return row
+
+
+def _stdin_lines() -> Iterator[str]:
+    """Возвращает непустые строки стандартного ввода."""
+    for line in sys.stdin:
+        line = line.strip()
+        if line:
+            yield line
+
+
+def _read_jsonl() -> Iterator[Optional[dict]]:
+    """Читает заметки в формате JSON Lines со стандартного ввода.
+
+    Yields:
+        Optional[dict]: Словарь заметки или None для некорректной строки
+    """
+    for line in _stdin_lines():
+        try:
+            yield json.loads(line)
+        except json.JSONDecodeError:
+            yield None
+
+
+def cmd_add(storage: Storage, args) -> bool:
+    """Добавляет одну заметку из аргументов или пакет со стандартного ввода."""
+    if args.title is None:
+        ids = storage.import_from(_read_jsonl())
+        _emit({"line": line, "id": note_id} for line, note_id in enumerate(ids, 1))
+        return all(note_id is not None for note_id in ids)
+    note = Note(title=args.title, content=args.content, priority=args.priority,
+                status=args.status, tags=args.tags.split(",") if args.tags else None)
+    if not note.title or not storage.save(note):
+        print("Ошибка: заметка не сохранена", file=sys.stderr)
+        return False
+    _emit([_note_row(note)])
+    return True
+
+
+def cmd_list(storage: Storage, args) -> bool:
+    """Выводит заметки, при необходимости отбирая и сортируя их."""
+    if args.tag or args.priority or args.status or args.since or args.until:
+        created = (args.since, args.until) if args.since or args.until else None
+        notes: Iterable[Note] = storage.query(tags=args.tag, priority=args.priority,
+                                              status=args.status, created_between=created)
+        if args.sort:
+            notes = sorted(notes, key=sort_key(args.sort), reverse=args.desc)
+    elif args.sort:
+        # Первые --limit заметок выбираются без сортировки остальных
+        notes = storage.order_by(args.sort, args.desc, args.limit)
+    else:
+        notes = storage.iter_notes()
+    _emit(_note_row(note, not args.no_content) for note in _limit(notes, args.limit))
+    return True
+
+
+def cmd_search(storage: Storage, args) -> bool:
+    """Выводит заметки, найденные по запросу."""
+    notes = _limit(storage.iter_search(args.query), args.limit)
+    _emit(_note_row(note, not args.no_content) for note in notes)
+    return True
+
+
+def cmd_get(storage: Storage, args) -> bool:
+    """Выводит заметки по ID; отсутствующие ID выводятся с note = null."""
+    found = True
+    rows = []
+    for note_id in args.ids:
+        note = storage.get(note_id)
+        found = found and note is not None
+        rows.append(_note_row(note) if note is not None else {"id": note_id, "note": None})
+    _emit(rows)
+    return found
+
+
+def cmd_delete(storage: Storage, args) -> bool:
+    """Удаляет заметки по ID из аргументов или со стандартного ввода."""
+    ids = args.ids
+    if not ids:
+        try:
+            ids = [int(line) for line in _stdin_lines()]
+        except ValueError as e:
+            print(f"Ошибка: некорректный ID: {e}", file=sys.stderr)
+            return False
+    results = storage.delete_many(ids)
+    _emit({"id": note_id, "deleted": ok} for note_id, ok in zip(ids, results))
+    return all(results)
+
+
+def cmd_export(storage: Storage, args) -> bool:
+    """Выгружает заметки в файл JSON или JSON Lines."""
+    try:
+        count = storage.export(args.path)
+    except (PermissionError, OSError) as e:
+        print(f"Ошибка при экспорте: {e}", file=sys.stderr)
+        return False
+    _emit([{"path": args.path, "count": count}])
+    return True
+
+
+def _limit(notes: Iterable[Note], limit: Optional[int]) -> Iterator[Note]:
+    """Ограничивает число выводимых заметок, не дочитывая остальные."""
+    for i, note in enumerate(notes):
+        if limit is not None and i >= limit:
+            return
+        yield note
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Создает разбор аргументов командной строки.
+
+    Returns:
+        argparse.ArgumentParser: Разбор аргументов с подкомандами
+    """
+    parser = argparse.ArgumentParser(prog="python -m notebook",
+                                     description="Менеджер заметок в командной строке")
+    parser.add_argument("--backend", choices=sorted(BACKENDS), help="тип хранилища")
+    parser.add_argument("--file", help="путь к файлу хранилища")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    add = commands.add_parser("add", help="добавить заметку; без --title — JSON Lines со stdin")
+    add.add_argument("--title", help="заголовок")
+    add.add_argument("--content", default="", help="содержание")
+    add.add_argument("--tags", help="теги через запятую")
+    add.add_argument("--priority", choices=PRIORITIES, default="medium")
+    add.add_argument("--status", choices=STATUSES, default="active")
+    add.set_defaults(handler=cmd_add)
+
+    for name, handler, help_text in (("list", cmd_list, "вывести заметки"),
+                                     ("search", cmd_search, "найти заметки")):
+        command = commands.add_parser(name, help=help_text)
+        if name == "search":
+            command.add_argument("query", help="поисковый запрос; слова с «#» ищутся среди тегов")
+        else:
+            command.add_argument("--tag", action="append", help="тег (можно несколько)")
+            command.add_argument("--priority", action="append", choices=PRIORITIES)
+            command.add_argument("--status", action="append", choices=STATUSES)
+            command.add_argument("--since", help="создана не раньше (ISO)")
+            command.add_argument("--until", help="создана раньше (ISO)")
+            command.add_argument("--sort", choices=SORT_FIELDS, help="поле сортировки")
+            command.add_argument("--desc", action="store_true", help="сортировать по убыванию")
+        command.add_argument("--limit", type=int, help="не больше указанного числа заметок")
+        command.add_argument("--no-content", action="store_true", help="не выводить содержание")
+        command.set_defaults(handler=handler)
+
+    get = commands.add_parser("get", help="вывести заметки по ID")
+    get.add_argument("ids", type=int, nargs="+", metavar="ID")
+    get.set_defaults(handler=cmd_get)
+
+    delete = commands.add_parser("delete", help="удалить заметки; без ID — ID со stdin")
+    delete.add_argument("ids", type=int, nargs="*", metavar="ID")
+    delete.set_defaults(handler=cmd_delete)
+
+    export = commands.add_parser("export", help="выгрузить заметки в .json или .jsonl")
+    export.add_argument("path", help="путь к файлу экспорта")
+    export.set_defaults(handler=cmd_export)
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Выполняет команду.
+
+    Args:
+        argv (List[str], optional): Аргументы; по умолчанию sys.argv[1:]
+
+    Returns:
+        int: 0 при успехе, 1 при ошибке
+    """
+    args = build_parser().parse_args(argv)
+    try:
+        storage = open_storage(args.backend, args.file)
+    except ValueError as e:
+        print(f"Ошибка: {e}", file=sys.stderr)
+        return 1
+    try:
+        ok = args.handler(storage, args)
+    except BrokenPipeError:
+        # Получатель вывода закрылся раньше (например, head);
+        # остаток вывода отбрасывается, чтобы не было ошибки при выходе
+        os.dup2(os.open(os.devnull, os.O_WRONLY), sys.stdout.fileno())
+        return 0
+    finally:
+        storage.close()
+    return 0 if ok else 1
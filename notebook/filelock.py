@@ -0,0 +1,117 @@
+"""
+Модуль filelock - межпроцессная рекомендательная блокировка хранилища.
+
+Запись в хранилище выполняется под блокировкой файла <имя>.lock рядом
+с файлом заметок, поэтому два процесса (например, два окна NoteApp или
+скрипт и окно) не перезаписывают изменения друг друга. Используется
+fcntl.flock в POSIX и msvcrt.locking в Windows; чтение не блокируется.
+"""
+
+import os
+import threading
+import time
+from typing import Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+# Сколько ждать освобождения блокировки другим процессом, с
+LOCK_TIMEOUT = 10.0
+POLL_INTERVAL = 0.01
+
+
+class FileLock:
+    """Эксклюзивная блокировка файла, повторно входимая в пределах процесса.
+
+    Пример: with FileLock("notes.lock"): ...
+
+    Attributes:
+        path (str): Путь к файлу блокировки
+        timeout (float): Время ожидания блокировки в секундах
+    """
+
+    def __init__(self, path: str, timeout: float = LOCK_TIMEOUT):
+        """Создает блокировку, не захватывая ее.
+
+        Args:
+            path (str): Путь к файлу блокировки
+            timeout (float, optional): Время ожидания. Defaults to LOCK_TIMEOUT.
+        """
+        self.path = path
+        self.timeout = timeout
+        self._fd: Optional[int] = None
+        self._depth = 0
+        self._lock = threading.RLock()
+
+    def acquire(self):
+        """Захватывает блокировку, ожидая другие процессы не дольше timeout.
+
+        Raises:
+            TimeoutError: Если блокировку не удалось получить за timeout
+            OSError: Если файл блокировки не удалось открыть
+        """
+        self._lock.acquire()
+        if self._depth:
+            self._depth += 1
+            return
+        try:
+            fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            self._lock.release()
+            raise
+        deadline = time.monotonic() + self.timeout
+        while not _try_lock(fd):
+            if time.monotonic() >= deadline:
+                os.close(fd)
+                self._lock.release()
+                raise TimeoutError(f"файл {self.path} заблокирован другим процессом")
+            time.sleep(POLL_INTERVAL)
+        self._fd = fd
+        self._depth = 1
+
+    def release(self):
+        """Освобождает блокировку."""
+        self._depth -= 1
+        if not self._depth:
+            _unlock(self._fd)
+            os.close(self._fd)
+            self._fd = None
+        self._lock.release()
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, *exc):
+        self.release()
+        return False
+
+
+def _try_lock(fd: int) -> bool:
+    """Пытается захватить блокировку файла без ожидания."""
+    try:
+        if fcntl is not None:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        else:
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        return True
+    except (BlockingIOError, PermissionError):
+        return False
+    except OSError:
+        # msvcrt сообщает о занятой блокировке как EDEADLOCK/EACCES
+        if fcntl is None:
+            return False
+        raise
+
+
+def _unlock(fd: int):
+    """Освобождает блокировку файла."""
+    if fcntl is not None:
+        fcntl.flock(fd, fcntl.LOCK_UN)
+    else:
+        os.lseek(fd, 0, os.SEEK_SET)
+        msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
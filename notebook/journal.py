@@ -0,0 +1,387 @@
+"""
+Модуль journal - журнальное хранилище заметок.
+
+Каждое добавление, изменение и удаление дописывается одной строкой
+в журнал (JSON Lines), поэтому стоимость записи не зависит от числа
+заметок. При открытии восстанавливается снимок и поверх него
+проигрывается хвост журнала. Когда журнал разрастается, фоновое
+уплотнение сворачивает его в новый снимок.
+
+Файлы рядом с notes.json:
+    notes.snapshot.json: Снимок — JSON-массив заметок
+    notes.log: Журнал операций после снимка
+    notes.log.old: Журнал, который сейчас сворачивается в снимок
+    notes.ids.json: Следующий свободный ID (обновляется при уплотнении)
+    notes.lock: Блокировка записи для нескольких процессов (см. filelock)
+    notes.version: Номер версии данных, растет при каждой записи
+"""
+
+import json
+import os
+import threading
+from typing import Iterator, List, Dict, Iterable, Optional, Tuple
+from .models import Note
+from .storage import Storage, NOTES_FILE
+from .profiling import PROFILER, timed
+
+# Уплотнять, когда журнал больше этого размера в байтах
+COMPACT_BYTES = 4 * 1024 * 1024
+# ...или когда записей в журнале больше этой доли от числа заметок
+COMPACT_RATIO = 0.5
+# Не уплотнять совсем маленькие журналы по соотношению
+COMPACT_MIN_RECORDS = 100
+
+
+class JournalStorage(Storage):
+    """Хранилище заметок на основе снимка и журнала операций.
+
+    Имеет тот же интерфейс, что и Storage (get_all/save/delete).
+    При первом открытии существующий notes.json переносится в снимок,
+    сам файл остается нетронутым.
+
+    Attributes:
+        file_path (str): Путь к исходному файлу заметок
+        snapshot_path (str): Путь к файлу снимка
+        log_path (str): Путь к журналу операций
+        compact_bytes (int): Порог размера журнала для уплотнения
+        compact_ratio (float): Порог доли записей журнала для уплотнения
+    """
+
+    def __init__(self, file_path: str = NOTES_FILE,
+                 compact_bytes: int = COMPACT_BYTES,
+                 compact_ratio: float = COMPACT_RATIO,
+                 persist_index: bool = False):
+        """Инициализирует журнальное хранилище.
+
+        Args:
+            file_path (str, optional): Путь к файлу заметок. Defaults to NOTES_FILE.
+            compact_bytes (int, optional): Порог размера журнала. Defaults to COMPACT_BYTES.
+            compact_ratio (float, optional): Порог доли записей. Defaults to COMPACT_RATIO.
+            persist_index (bool, optional): Сохранять поисковый индекс. Defaults to False.
+        """
+        super().__init__(file_path, persist_index)
+        base = os.path.splitext(file_path)[0]
+        self.snapshot_path = base + ".snapshot.json"
+        self.log_path = base + ".log"
+        self.compact_bytes = compact_bytes
+        self.compact_ratio = compact_ratio
+        self._lock = threading.RLock()
+        self._log_records = 0
+        # Наибольший ID в записях журнала, включая удаленные заметки
+        self._log_max_id = 0
+        self._compactor: Optional[threading.Thread] = None
+        self._convert_legacy()
+
+    @property
+    def _old_log_path(self) -> str:
+        """Путь к журналу, который сворачивается в снимок."""
+        return self.log_path + ".old"
+
+    def _convert_legacy(self):
+        """Переносит существующий notes.json в снимок при первом открытии."""
+        if os.path.exists(self.snapshot_path) or os.path.exists(self.log_path):
+            return
+        if not os.path.exists(self.file_path):
+            return
+        self._write_snapshot(super()._load_notes())
+
+    def _write_snapshot(self, notes: List[Dict]) -> bool:
+        """Атомарно записывает снимок (временный файл + os.replace).
+
+        Args:
+            notes (List[Dict]): Список заметок для сохранения
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        tmp_path = self._write_snapshot_tmp(notes)
+        if tmp_path is None:
+            return False
+        try:
+            os.replace(tmp_path, self.snapshot_path)
+            return True
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи снимка: {e}")
+            return False
+
+    def _write_snapshot_tmp(self, notes: List[Dict]) -> Optional[str]:
+        """Записывает снимок во временный файл, свой для каждого процесса.
+
+        Args:
+            notes (List[Dict]): Список заметок для сохранения
+
+        Returns:
+            Optional[str]: Путь к временному файлу или None при ошибке
+        """
+        tmp_path = f"{self.snapshot_path}.{os.getpid()}.tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(notes, f, ensure_ascii=False, separators=(',', ':'))
+                f.flush()
+                os.fsync(f.fileno())
+            return tmp_path
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи снимка: {e}")
+            _remove(tmp_path)
+            return None
+
+    def _file_stamp(self) -> Tuple:
+        """Возвращает совокупный отпечаток снимка и журналов.
+
+        Returns:
+            Tuple: Отпечатки (mtime в нс, размер, inode) всех файлов хранилища
+        """
+        stamps = []
+        for path in (self.snapshot_path, self._old_log_path, self.log_path):
+            try:
+                st = os.stat(path)
+                stamps.append((st.st_mtime_ns, st.st_size, st.st_ino))
+            except OSError:
+                stamps.append(None)
+        return tuple(stamps)
+
+    def _replay_log(self, path: str, notes: Dict[int, Dict]) -> int:
+        """Проигрывает журнал поверх словаря заметок.
+
+        Args:
+            path (str): Путь к журналу
+            notes (Dict[int, Dict]): Заметки по ID, изменяются на месте
+
+        Returns:
+            int: Число примененных записей
+
+        Note:
+            Недописанная последняя строка (сбой во время записи) пропускается
+        """
+        if not os.path.exists(path):
+            return 0
+        count = 0
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    if record.get("op") == "put":
+                        item = record["note"]
+                        notes.pop(item["id"], None)
+                        notes[item["id"]] = item
+                        self._log_max_id = max(self._log_max_id, item["id"])
+                    elif record.get("op") == "del":
+                        notes.pop(record["id"], None)
+                        self._log_max_id = max(self._log_max_id, record["id"])
+                    count += 1
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при чтении журнала: {e}")
+        return count
+
+    def _iter_items(self) -> Iterator[Dict]:
+        """Возвращает записи хранилища для построения заметок.
+
+        Yields:
+            Dict: Записи, из которых _make_note() создает заметки
+        """
+        return iter(self._load_notes())
+
+    def _load_notes(self) -> List[Dict]:
+        """Восстанавливает заметки из снимка и хвоста журнала.
+
+        Returns:
+            List[Dict]: Список заметок в виде словарей
+        """
+        with self._lock:
+            notes = {}
+            self._log_max_id = 0
+            if os.path.exists(self.snapshot_path):
+                try:
+                    with open(self.snapshot_path, 'r', encoding='utf-8') as f:
+                        for item in json.load(f):
+                            notes[item["id"]] = item
+                except (json.JSONDecodeError, PermissionError) as e:
+                    print(f"Ошибка при чтении снимка: {e}")
+            records = self._replay_log(self._old_log_path, notes)
+            records += self._replay_log(self.log_path, notes)
+            self._log_records = records
+            return list(notes.values())
+
+    def _read_counter(self) -> int:
+        """Возвращает следующий свободный ID с учетом записей журнала.
+
+        Returns:
+            int: Следующий ID по файлу счетчика и журналу
+        """
+        return max(super()._read_counter(), self._log_max_id + 1)
+
+    def _keep_counter(self, deleted: List[int]) -> bool:
+        """Удаления записываются в журнал, счетчик сохраняется при уплотнении."""
+        return True
+
+    @timed()
+    def _write_batch(self, puts: List[Note], deletes: List[int]) -> bool:
+        """Дописывает пакет изменений в журнал одной записью.
+
+        Args:
+            puts (List[Note]): Добавленные и обновленные заметки с ID
+            deletes (List[int]): ID удаляемых заметок
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        records = [{"op": "put", "note": n.to_dict()} for n in puts]
+        records.extend({"op": "del", "id": note_id} for note_id in deletes)
+        data = "".join(json.dumps(r, ensure_ascii=False) + "\n" for r in records).encode("utf-8")
+        try:
+            with open(self.log_path, 'a+b') as f:
+                # После сбоя последняя строка может быть недописанной: запись,
+                # приклеенная к ней, тоже пропускалась бы при проигрывании
+                if f.seek(0, os.SEEK_END):
+                    f.seek(-1, os.SEEK_END)
+                    if f.read(1) != b"\n":
+                        data = b"\n" + data
+                f.write(data)
+                if PROFILER.enabled:
+                    PROFILER.add_bytes("JournalStorage._write_batch", len(data))
+            self._log_records += len(records)
+            return True
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи в журнал: {e}")
+            return False
+
+    def save_many(self, notes: Iterable[Note]) -> List[bool]:
+        """Сохраняет пакет заметок одной записью в журнал.
+
+        Args:
+            notes (Iterable[Note]): Заметки для добавления или обновления
+
+        Returns:
+            List[bool]: Результат для каждой заметки в порядке передачи
+        """
+        with self._lock:
+            results = super().save_many(notes)
+            self._maybe_compact()
+            return results
+
+    def delete_many(self, note_ids: Iterable[int]) -> List[bool]:
+        """Удаляет пакет заметок одной записью в журнал.
+
+        Args:
+            note_ids (Iterable[int]): ID заметок для удаления
+
+        Returns:
+            List[bool]: Для каждого ID — True, если заметка удалена
+        """
+        with self._lock:
+            results = super().delete_many(note_ids)
+            self._maybe_compact()
+            return results
+
+    def _needs_compaction(self) -> bool:
+        """Проверяет, достигнут ли порог уплотнения журнала.
+
+        Returns:
+            bool: True если журнал пора свернуть в снимок
+        """
+        try:
+            log_size = os.path.getsize(self.log_path)
+        except OSError:
+            return False
+        if log_size >= self.compact_bytes:
+            return True
+        live = len(self._notes or ())
+        return (self._log_records >= COMPACT_MIN_RECORDS and
+                self._log_records >= self.compact_ratio * max(live, 1))
+
+    def _maybe_compact(self):
+        """Запускает фоновое уплотнение, если достигнут порог."""
+        if self._compactor is not None and self._compactor.is_alive():
+            return
+        if not self._needs_compaction():
+            return
+        self.compact(wait=False)
+
+    def compact(self, wait: bool = True):
+        """Сворачивает журнал в новый снимок.
+
+        Текущий журнал переименовывается в notes.log.old, новые записи
+        идут в свежий журнал, а снимок пишется в фоновом потоке.
+        Сбой на любом шаге безопасен: при открытии проигрываются
+        снимок, notes.log.old и notes.log по порядку. Если уплотнение
+        одновременно выполняет другой процесс, снимок заменяется только
+        тем уплотнением, которое первым завершилось (см. _compact_worker).
+
+        Args:
+            wait (bool, optional): Дождаться завершения. Defaults to True.
+        """
+        with self._lock, self._writing() as locked:
+            if not locked:
+                return
+            if self._compactor is not None and self._compactor.is_alive():
+                thread = self._compactor
+            else:
+                notes = self._get_cache()
+                # После уплотнения ID удаленных заметок есть только в счетчике
+                if not self._write_counter():
+                    return
+                if os.path.exists(self.log_path) and not os.path.exists(self._old_log_path):
+                    os.replace(self.log_path, self._old_log_path)
+                self._log_records = 0
+                self._stamp = self._file_stamp()
+                # Снимок и свернутый журнал, которые заменит это уплотнение
+                snapshot_stamp, old_stamp = self._stamp[0], self._stamp[1]
+                data = [n.to_dict() for n in notes.values()]
+                thread = threading.Thread(target=self._compact_worker,
+                                          args=(data, snapshot_stamp, old_stamp), daemon=True)
+                self._compactor = thread
+                thread.start()
+        if wait:
+            thread.join()
+
+    def _compact_worker(self, data: List[Dict], snapshot_stamp, old_stamp):
+        """Пишет снимок и удаляет свернутый журнал.
+
+        Снимок пишется без блокировки, а заменяется под блокировкой
+        файла и только если снимок и notes.log.old остались теми же,
+        что при начале уплотнения. Иначе их уже заменило уплотнение
+        другого процесса, данные которого не старше этих, и записанный
+        снимок отбрасывается.
+
+        Args:
+            data (List[Dict]): Заметки на момент начала уплотнения
+            snapshot_stamp: Отпечаток снимка на момент начала уплотнения
+            old_stamp: Отпечаток notes.log.old на момент начала уплотнения
+        """
+        tmp_path = self._write_snapshot_tmp(data)
+        if tmp_path is None:
+            return
+        with self._lock, self._writing() as locked:
+            current = self._file_stamp()
+            if not locked or (current[0], current[1]) != (snapshot_stamp, old_stamp):
+                _remove(tmp_path)
+                return
+            try:
+                os.replace(tmp_path, self.snapshot_path)
+            except (PermissionError, OSError) as e:
+                print(f"Ошибка при записи снимка: {e}")
+                _remove(tmp_path)
+                return
+            _remove(self._old_log_path)
+            # Журнал, дописанный другим процессом во время уплотнения,
+            # будет перечитан при следующем обращении
+            if current[2] == self._stamp[2]:
+                self._stamp = self._file_stamp()
+
+    def close(self):
+        """Дожидается завершения фонового уплотнения и сохраняет индекс."""
+        thread = self._compactor
+        if thread is not None:
+            thread.join()
+        super().close()
+
+
+def _remove(path: str):
+    """Удаляет файл, если он существует."""
+    try:
+        os.remove(path)
+    except OSError:
+        pass
@@ -2,10 +2,61 @@
 Модуль models - определение структуры данных заметки.
 Содержит класс Note для представления заметок с различными атрибутами:
 заголовок, содержание, приоритет, статус, теги и временные метки.
+
+Заметки занимают минимум памяти: атрибуты хранятся в __slots__,
+повторяющиеся строки (приоритет, статус, теги) интернируются,
+а время создания хранится целым числом микросекунд.
 """
 
-from datetime import datetime
-from typing import Optional, List
+import sys
+from datetime import datetime, timedelta
+from typing import Callable, Optional, List, Union
+
+PRIORITIES = ("low", "medium", "high")
+STATUSES = ("active", "done", "archived")
+
+_EPOCH = datetime(1970, 1, 1)
+_MICROSECOND = timedelta(microseconds=1)
+
+
+def _pack_time(value) -> Union[int, str, tuple]:
+    """Переводит строку ISO в число микросекунд от начала эпохи.
+
+    Args:
+        value (str): Временная метка в формате ISO
+
+    Returns:
+        Union[int, str, tuple]: Число микросекунд; исходная строка, если
+            обратное преобразование не восстановит ее в точности; прочие
+            значения (например, null из файла) — в кортеже из одного
+            элемента, чтобы число из файла не приняли за микросекунды
+    """
+    if not isinstance(value, str):
+        return (value,)
+    try:
+        dt = datetime.fromisoformat(value)
+    except ValueError:
+        return value
+    if dt.tzinfo is not None or dt.isoformat() != value:
+        return value
+    return (dt - _EPOCH) // _MICROSECOND
+
+
+def _unpack_time(value: Union[int, str, tuple]):
+    """Переводит число микросекунд обратно в строку ISO.
+
+    Args:
+        value (Union[int, str, tuple]): Результат _pack_time()
+
+    Returns:
+        Временная метка в формате ISO или исходное значение, если
+            оно не было строкой
+    """
+    if isinstance(value, str):
+        return value
+    if isinstance(value, tuple):
+        return value[0]
+    return (_EPOCH + value * _MICROSECOND).isoformat()
 
 
 class Note:
@@ -14,13 +65,16 @@ class Note:
     Attributes:
         id (Optional[int]): Уникальный идентификатор заметки
         title (str): Заголовок заметки
-        content (str): Содержание заметки
+        content (str): Содержание заметки (может загружаться при первом обращении)
         priority (str): Уровень приоритета (low/medium/high)
         status (str): Статус заметки (active/done/archived)
         tags (List[str]): Список тегов заметки
         created_at (str): Временная метка создания в формате ISO
     """
 
+    __slots__ = ("id", "title", "_content", "_content_loader",
+                 "priority", "status", "tags", "_created")
+
     def __init__(self, title: str, content: str,
                  priority: str = "medium", status: str = "active",
                  tags: List[str] = None):
@@ -35,11 +89,51 @@ class Note:
         """
         self.id: Optional[int] = None
         self.title = title.strip()
+        # Функция чтения содержания для заметок, загруженных без него
+        self._content_loader: Optional[Callable[[], str]] = None
         self.content = content.strip()
-        self.priority = priority.lower()
-        self.status = status.lower()
-        self.tags = [t.strip().lower() for t in (tags or []) if t.strip()]
-        self.created_at = datetime.now().isoformat()
+        self.priority = sys.intern(priority.lower())
+        self.status = sys.intern(status.lower())
+        self.tags = [sys.intern(t.strip().lower()) for t in (tags or []) if t.strip()]
+        # Микросекунды от начала эпохи; строка ISO собирается при чтении
+        self._created: Union[int, str, tuple] = (datetime.now() - _EPOCH) // _MICROSECOND
+
+    @property
+    def created_at(self) -> str:
+        """Временная метка создания в формате ISO."""
+        return _unpack_time(self._created)
+
+    @created_at.setter
+    def created_at(self, value: str):
+        self._created = _pack_time(value)
+
+    @property
+    def content(self) -> str:
+        """Содержание заметки; при ленивой загрузке читается при первом обращении."""
+        if self._content_loader is not None:
+            self._content = self._content_loader()
+            self._content_loader = None
+        return self._content
+
+    @content.setter
+    def content(self, value: str):
+        self._content = value
+        self._content_loader = None
+
+    @property
+    def content_loaded(self) -> bool:
+        """True, если содержание уже находится в памяти."""
+        return self._content_loader is None
+
+    def peek_content(self) -> str:
+        """Возвращает содержание, не оставляя его в памяти заметки.
+
+        Returns:
+            str: Содержание заметки
+        """
+        if self._content_loader is not None:
+            return self._content_loader()
+        return self._content
 
     def to_dict(self) -> dict:
         """Преобразует объект заметки в словарь.
@@ -76,4 +170,19 @@ class Note:
         )
         note.id = data["id"]
         note.created_at = data["created_at"]
+        return note
+
+    @staticmethod
+    def from_metadata(data: dict, content_loader: Callable[[], str]) -> 'Note':
+        """Создает заметку без содержания, которое загрузится при обращении.
+
+        Args:
+            data (dict): Словарь с данными заметки без ключа "content"
+            content_loader (Callable[[], str]): Функция чтения содержания
+
+        Returns:
+            Note: Объект заметки с ленивым содержанием
+        """
+        note = Note.from_dict(dict(data, content=""))
+        note._content_loader = content_loader
         return note
\ No newline at end of file
@@ -0,0 +1,231 @@
+"""
+Модуль profiling - встроенные замеры горячих путей хранилища и интерфейса.
+
+Для каждой точки замера собираются число вызовов, суммарное и
+максимальное время, гистограмма задержек и объем прочитанных или
+записанных байт. По умолчанию замеры выключены, и обертка стоит одну
+проверку флага. Включаются переменной окружения ZAMETKI_PROFILE
+(путь к отчету .json или .csv, либо «1» для отчета по умолчанию)
+или параметром --profile главного модуля; отчет пишется при выходе.
+"""
+
+import atexit
+import csv
+import functools
+import json
+import os
+import threading
+import time
+from typing import Callable, Dict, List, Optional
+
+ENV_VAR = "ZAMETKI_PROFILE"
+DEFAULT_OUTPUT = "zametki_profile.json"
+# Верхние границы корзин гистограммы задержек в секундах (последняя — без границы)
+BUCKETS = (0.0001, 0.001, 0.01, 0.1, 1.0)
+BUCKET_LABELS = ("≤0.1мс", "≤1мс", "≤10мс", "≤100мс", "≤1с", ">1с")
+
+
+class Metric:
+    """Накопленная статистика одной точки замера."""
+
+    __slots__ = ("count", "total", "max", "histogram", "bytes")
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.histogram = [0] * (len(BUCKETS) + 1)
+        self.bytes = 0
+
+
+class Profiler:
+    """Сборщик статистики замеров.
+
+    Attributes:
+        enabled (bool): Включены ли замеры
+        output (Optional[str]): Путь к отчету, записываемому при выходе
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.output: Optional[str] = None
+        self._metrics: Dict[str, Metric] = {}
+        # Замеры приходят и из потока Tk, и из фонового потока хранилища
+        self._lock = threading.Lock()
+        self._atexit = False
+
+    def enable(self, output: Optional[str] = None):
+        """Включает замеры.
+
+        Args:
+            output (str, optional): Путь к отчету (.json или .csv),
+                который будет записан при завершении программы
+        """
+        self.enabled = True
+        if output:
+            self.output = output
+            if not self._atexit:
+                atexit.register(self._dump_at_exit)
+                self._atexit = True
+
+    def disable(self):
+        """Выключает замеры, не сбрасывая накопленную статистику."""
+        self.enabled = False
+
+    def reset(self):
+        """Сбрасывает накопленную статистику."""
+        with self._lock:
+            self._metrics = {}
+
+    def _metric(self, name: str) -> Metric:
+        """Возвращает статистику точки замера, создавая ее при необходимости."""
+        metric = self._metrics.get(name)
+        if metric is None:
+            metric = self._metrics[name] = Metric()
+        return metric
+
+    def record(self, name: str, seconds: float, nbytes: int = 0):
+        """Учитывает один вызов.
+
+        Args:
+            name (str): Имя точки замера
+            seconds (float): Длительность вызова
+            nbytes (int, optional): Прочитано или записано байт. Defaults to 0.
+        """
+        bucket = 0
+        while bucket < len(BUCKETS) and seconds > BUCKETS[bucket]:
+            bucket += 1
+        with self._lock:
+            metric = self._metric(name)
+            metric.count += 1
+            metric.total += seconds
+            metric.max = max(metric.max, seconds)
+            metric.histogram[bucket] += 1
+            metric.bytes += nbytes
+
+    def add_bytes(self, name: str, nbytes: int):
+        """Учитывает прочитанные или записанные байты без замера времени.
+
+        Args:
+            name (str): Имя точки замера
+            nbytes (int): Число байт
+        """
+        with self._lock:
+            self._metric(name).bytes += nbytes
+
+    def snapshot(self) -> List[Dict]:
+        """Возвращает статистику в виде списка словарей.
+
+        Returns:
+            List[Dict]: Строки статистики, отсортированные по суммарному времени
+        """
+        with self._lock:
+            items = list(self._metrics.items())
+        rows = []
+        for name, m in items:
+            rows.append({
+                "name": name,
+                "count": m.count,
+                "total_s": round(m.total, 6),
+                "mean_ms": round(m.total / m.count * 1000, 3) if m.count else 0.0,
+                "max_ms": round(m.max * 1000, 3),
+                "bytes": m.bytes,
+                "histogram": dict(zip(BUCKET_LABELS, m.histogram)),
+            })
+        rows.sort(key=lambda row: row["total_s"], reverse=True)
+        return rows
+
+    def dump(self, path: Optional[str] = None) -> Optional[str]:
+        """Записывает отчет в JSON или CSV (по расширению файла).
+
+        Args:
+            path (str, optional): Путь к отчету; по умолчанию self.output
+
+        Returns:
+            Optional[str]: Путь к записанному отчету или None при ошибке
+        """
+        path = path or self.output or DEFAULT_OUTPUT
+        rows = self.snapshot()
+        try:
+            if path.endswith(".csv"):
+                with open(path, 'w', encoding='utf-8', newline='') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(["name", "count", "total_s", "mean_ms", "max_ms", "bytes",
+                                     *BUCKET_LABELS])
+                    for row in rows:
+                        writer.writerow([row["name"], row["count"], row["total_s"], row["mean_ms"],
+                                         row["max_ms"], row["bytes"], *row["histogram"].values()])
+            else:
+                with open(path, 'w', encoding='utf-8') as f:
+                    json.dump(rows, f, ensure_ascii=False, indent=2)
+            return path
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи отчета: {e}")
+            return None
+
+    def _dump_at_exit(self):
+        """Записывает отчет при завершении программы."""
+        if self.enabled and self._metrics:
+            self.dump()
+
+
+PROFILER = Profiler()
+
+
+class measure:
+    """Контекстный менеджер для замера участка кода.
+
+    Пример: with measure("Storage._make_notes"): ...
+    """
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = None
+
+    def __enter__(self):
+        if PROFILER.enabled:
+            self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        if self.start is not None:
+            PROFILER.record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """Декоратор, замеряющий вызовы функции или метода.
+
+    Args:
+        name (str, optional): Имя точки замера; по умолчанию
+            квалифицированное имя функции (например, «Storage.get_all»)
+
+    Returns:
+        Callable: Декоратор
+    """
+    def decorator(func: Callable) -> Callable:
+        label = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.record(label, time.perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+def configure_from_env():
+    """Включает замеры, если задана переменная окружения ZAMETKI_PROFILE."""
+    value = os.environ.get(ENV_VAR, "").strip()
+    if value and value != "0":
+        PROFILER.enable(DEFAULT_OUTPUT if value == "1" else value)
+
+
+configure_from_env()
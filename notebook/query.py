@@ -0,0 +1,303 @@
+"""
+Модуль query - вторичные индексы и выполнение структурных запросов.
+
+Хеш-индексы по тегу, приоритету и статусу хранят множества ID заметок,
+упорядоченный индекс по дате создания позволяет выбирать диапазоны
+через bisect. Планировщик пересекает множества, начиная с самого
+избирательного условия, поэтому заметки, не подходящие под запрос,
+не просматриваются.
+
+Порядки сортировки (по ID, заголовку, приоритету, статусу, дате) строятся
+при первом обращении и затем поддерживаются вставкой через bisect, так
+что смена сортировки и выборка первых N заметок не сортируют все заметки.
+"""
+
+from bisect import bisect_left, insort
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple, Union
+from .models import PRIORITIES, STATUSES
+from .search_index import fold
+
+DateBound = Union[str, datetime, None]
+
+# Поля сортировки; в порядке по убыванию приоритет и статус идут
+# от старшего значения, а при равенстве — от новых заметок к старым
+SORT_FIELDS = ("id", "title", "priority", "status", "created")
+PRIORITY_RANK = {p: i for i, p in enumerate(PRIORITIES)}
+STATUS_RANK = {s: i for i, s in enumerate(STATUSES)}
+
+
+def to_iso(value: DateBound) -> Optional[str]:
+    """Приводит границу диапазона дат к строке ISO.
+
+    Args:
+        value (Union[str, datetime, None]): Граница диапазона
+
+    Returns:
+        Optional[str]: Строка ISO или None, если граница не задана
+    """
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return value
+
+
+def value_set(value) -> Set[str]:
+    """Приводит значение условия к множеству строк в нижнем регистре.
+
+    Args:
+        value (Union[str, Iterable[str]]): Одно значение или набор значений
+
+    Returns:
+        Set[str]: Множество значений
+    """
+    if isinstance(value, str):
+        value = [value]
+    return {v.strip().lstrip('#').lower() for v in value}
+
+
+def _created_key(note) -> str:
+    """Возвращает дату создания для сравнения; не строки (null) идут первыми."""
+    created = note.created_at
+    return created if isinstance(created, str) else ""
+
+
+def sort_key(field: str) -> Callable[..., tuple]:
+    """Возвращает функцию ключа сортировки заметок по полю.
+
+    Последний элемент ключа — ID заметки, поэтому ключи различны
+    и порядок при равных значениях поля определен.
+
+    Args:
+        field (str): Поле из SORT_FIELDS
+
+    Returns:
+        Callable[[Note], tuple]: Функция заметка → ключ
+
+    Raises:
+        ValueError: Если поле неизвестно
+    """
+    if field == "id":
+        return lambda note: (note.id,)
+    if field == "title":
+        return lambda note: (fold(note.title), note.id)
+    if field == "priority":
+        return lambda note: (PRIORITY_RANK.get(note.priority, -1), _created_key(note), note.id)
+    if field == "status":
+        return lambda note: (STATUS_RANK.get(note.status, -1), _created_key(note), note.id)
+    if field == "created":
+        return lambda note: (_created_key(note), note.id)
+    raise ValueError(f"Неизвестное поле сортировки: {field} (доступны: {', '.join(SORT_FIELDS)})")
+
+
+class NoteIndexes:
+    """Вторичные индексы по полям заметок.
+
+    Attributes:
+        by_tag (Dict[str, Set[int]]): Тег → ID заметок
+        by_priority (Dict[str, Set[int]]): Приоритет → ID заметок
+        by_status (Dict[str, Set[int]]): Статус → ID заметок
+        by_created (List[Tuple[str, int]]): Упорядоченные пары (дата, ID)
+        orders (Dict[str, List[tuple]]): Построенные порядки сортировки —
+            упорядоченные ключи sort_key(), последний элемент ключа — ID
+    """
+
+    def __init__(self):
+        """Создает пустые индексы."""
+        self.by_tag: Dict[str, Set[int]] = {}
+        self.by_priority: Dict[str, Set[int]] = {}
+        self.by_status: Dict[str, Set[int]] = {}
+        self.by_created: List[Tuple[str, int]] = []
+        # Проиндексированные значения каждой заметки — для удаления
+        self._entries: Dict[int, Tuple[Tuple[str, ...], str, str, str]] = {}
+        # Порядок по дате совпадает с by_created, остальные строятся в order()
+        self.orders: Dict[str, List[tuple]] = {}
+        self._order_keys: Dict[str, Dict[int, tuple]] = {}
+
+    @classmethod
+    def build(cls, notes: Iterable) -> 'NoteIndexes':
+        """Строит индексы по набору заметок.
+
+        Args:
+            notes (Iterable[Note]): Заметки для индексации
+
+        Returns:
+            NoteIndexes: Заполненные индексы
+        """
+        indexes = cls()
+        created = []
+        for note in notes:
+            indexes._add_hashed(note)
+            created.append((_created_key(note), note.id))
+        created.sort()
+        indexes.by_created = created
+        return indexes
+
+    def _add_hashed(self, note):
+        """Добавляет заметку в хеш-индексы.
+
+        Args:
+            note (Note): Заметка с назначенным ID
+        """
+        tags = tuple(note.tags)
+        for tag in tags:
+            self.by_tag.setdefault(tag, set()).add(note.id)
+        self.by_priority.setdefault(note.priority, set()).add(note.id)
+        self.by_status.setdefault(note.status, set()).add(note.id)
+        self._entries[note.id] = (tags, note.priority, note.status, _created_key(note))
+
+    def add(self, note):
+        """Добавляет или переиндексирует заметку.
+
+        Args:
+            note (Note): Заметка с назначенным ID
+        """
+        self.remove(note.id)
+        self._add_hashed(note)
+        insort(self.by_created, (_created_key(note), note.id))
+        for field, keys in self._order_keys.items():
+            key = keys[note.id] = sort_key(field)(note)
+            insort(self.orders[field], key)
+
+    def remove(self, note_id: int):
+        """Удаляет заметку из индексов.
+
+        Args:
+            note_id (int): ID заметки
+        """
+        entry = self._entries.pop(note_id, None)
+        if entry is None:
+            return
+        tags, priority, status, created_at = entry
+        for index, key in [(self.by_tag, t) for t in tags] + [
+                (self.by_priority, priority), (self.by_status, status)]:
+            ids = index.get(key)
+            if ids is not None:
+                ids.discard(note_id)
+                if not ids:
+                    del index[key]
+        pos = bisect_left(self.by_created, (created_at, note_id))
+        if pos < len(self.by_created) and self.by_created[pos] == (created_at, note_id):
+            del self.by_created[pos]
+        for field, keys in self._order_keys.items():
+            key = keys.pop(note_id, None)
+            order = self.orders[field]
+            pos = bisect_left(order, key) if key is not None else len(order)
+            if pos < len(order) and order[pos] == key:
+                del order[pos]
+
+    def order(self, field: str, notes: Iterable) -> List[tuple]:
+        """Возвращает порядок сортировки, строя его при первом обращении.
+
+        Args:
+            field (str): Поле из SORT_FIELDS
+            notes (Iterable[Note]): Все проиндексированные заметки — нужны,
+                только если порядок еще не построен
+
+        Returns:
+            List[tuple]: Упорядоченные по возрастанию ключи; ID — последний
+                элемент ключа. Список поддерживается индексами, его нельзя изменять
+        """
+        if field == "created":
+            return self.by_created
+        order = self.orders.get(field)
+        if order is None:
+            key_func = sort_key(field)
+            keys = {note.id: key_func(note) for note in notes}
+            order = self.orders[field] = sorted(keys.values())
+            self._order_keys[field] = keys
+        return order
+
+    def _created_bounds(self, start: DateBound, end: DateBound) -> Tuple[int, int]:
+        """Находит границы диапазона дат в упорядоченном индексе.
+
+        Args:
+            start (Union[str, datetime, None]): Нижняя граница (включительно)
+            end (Union[str, datetime, None]): Верхняя граница (не включительно)
+
+        Returns:
+            Tuple[int, int]: Позиции начала и конца среза by_created
+        """
+        start, end = to_iso(start), to_iso(end)
+        lo = 0 if start is None else bisect_left(self.by_created, (start,))
+        hi = len(self.by_created) if end is None else bisect_left(self.by_created, (end,))
+        return lo, hi
+
+    def created_range(self, start: DateBound = None, end: DateBound = None) -> List[int]:
+        """Возвращает ID заметок, созданных в диапазоне [start, end).
+
+        Args:
+            start (Union[str, datetime, None]): Нижняя граница (включительно)
+            end (Union[str, datetime, None]): Верхняя граница (не включительно)
+
+        Returns:
+            List[int]: ID заметок в порядке даты создания
+        """
+        lo, hi = self._created_bounds(start, end)
+        return [note_id for _, note_id in self.by_created[lo:hi]]
+
+    def count_created(self, start: DateBound = None, end: DateBound = None) -> int:
+        """Считает заметки в диапазоне дат без их перебора.
+
+        Args:
+            start (Union[str, datetime, None]): Нижняя граница (включительно)
+            end (Union[str, datetime, None]): Верхняя граница (не включительно)
+
+        Returns:
+            int: Число заметок в диапазоне
+        """
+        lo, hi = self._created_bounds(start, end)
+        return max(hi - lo, 0)
+
+    def plan(self, tags=None, priority=None, status=None,
+             created_between: Optional[Tuple[DateBound, DateBound]] = None) -> Optional[Set[int]]:
+        """Выполняет запрос по индексам.
+
+        Условия одного поля объединяются по «или» (priority=["high", "medium"]),
+        разные поля и разные теги — по «и». Пересечение начинается с условия
+        с наименьшим числом кандидатов; условие, которое шире текущего
+        результата, проверяется по каждому кандидату вместо выборки из индекса.
+
+        Args:
+            tags (Union[str, Iterable[str]], optional): Теги, все обязательны
+            priority (Union[str, Iterable[str]], optional): Допустимые приоритеты
+            status (Union[str, Iterable[str]], optional): Допустимые статусы
+            created_between (Tuple, optional): Диапазон дат (start, end)
+
+        Returns:
+            Optional[Set[int]]: ID подходящих заметок или None, если условий нет
+        """
+        # Каждое условие — (оценка размера, выборка множества, проверка одного ID)
+        predicates = []
+        if tags is not None:
+            for tag in value_set(tags):
+                ids = self.by_tag.get(tag, set())
+                predicates.append((len(ids), lambda ids=ids: ids,
+                                   lambda i, ids=ids: i in ids))
+        for index, value in ((self.by_priority, priority), (self.by_status, status)):
+            if value is None:
+                continue
+            groups = [index.get(v, set()) for v in value_set(value)]
+            predicates.append((sum(map(len, groups)),
+                               lambda groups=groups: set().union(*groups),
+                               lambda i, groups=groups: any(i in g for g in groups)))
+        if created_between is not None:
+            start, end = created_between
+            lo, hi = to_iso(start), to_iso(end)
+            predicates.append((self.count_created(lo, hi),
+                               lambda: set(self.created_range(lo, hi)),
+                               lambda i: ((lo is None or self._entries[i][3] >= lo) and
+                                          (hi is None or self._entries[i][3] < hi))))
+        if not predicates:
+            return None
+
+        predicates.sort(key=lambda p: p[0])
+        result = set(predicates[0][1]())
+        for size, fetch, check in predicates[1:]:
+            if not result:
+                break
+            if size > len(result):
+                # Кандидатов меньше, чем в индексе — дешевле проверить каждого
+                result = {i for i in result if check(i)}
+            else:
+                result &= fetch()
+        return result
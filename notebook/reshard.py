@@ -0,0 +1,34 @@
+"""
+Модуль reshard - перераспределение заметок по шардам.
+
+Раскладывает существующий notes.json по шардам ShardedStorage или
+меняет схему разбиения уже разделенного хранилища.
+
+Запуск:
+    python -m notebook.reshard notes.json --scheme month
+    python -m notebook.reshard notes.json --scheme id --shard-size 20000
+"""
+
+import argparse
+from .sharded_storage import ShardedStorage, SCHEMES, SHARD_SIZE
+from .storage import NOTES_FILE
+
+
+def main(argv=None):
+    """Перераспределяет notes.json или существующее хранилище по шардам."""
+    parser = argparse.ArgumentParser(description="Перераспределение заметок по шардам")
+    parser.add_argument("file", nargs="?", default=NOTES_FILE, help="файл заметок (notes.json)")
+    parser.add_argument("--scheme", choices=SCHEMES, default="id", help="схема разбиения")
+    parser.add_argument("--shard-size", type=int, default=SHARD_SIZE, help="число ID в шарде")
+    args = parser.parse_args(argv)
+
+    storage = ShardedStorage(args.file, args.scheme, args.shard_size)
+    # Новое хранилище уже разложено по заданной схеме при открытии
+    if (storage.scheme, storage.shard_size) != (args.scheme, args.shard_size):
+        if not storage.reshard(args.scheme, args.shard_size):
+            return
+    print(f"Заметок: {storage.count()}, шардов: {len(storage.shards)} в {storage.shard_dir}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,304 @@
+"""
+Модуль search_index - инвертированный индекс для полнотекстового поиска.
+
+Заголовок, содержание и теги заметок разбиваются на слова, для каждого
+слова хранится множество ID заметок (posting list). Поиск пересекает
+эти множества, поэтому его стоимость зависит от числа совпадений,
+а не от общего числа заметок.
+"""
+
+import json
+import re
+from bisect import bisect_left, insort
+from typing import Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+_WORD_RE = re.compile(r"\w+")
+
+
+def fold(text: str) -> str:
+    """Приводит текст к единому регистру для поиска.
+
+    Args:
+        text (str): Исходный текст
+
+    Returns:
+        str: Текст в нижнем регистре с заменой «ё» на «е»
+    """
+    return text.casefold().replace("ё", "е")
+
+
+def tokenize(text: str) -> List[str]:
+    """Разбивает текст на слова (кириллица и латиница).
+
+    Args:
+        text (str): Исходный текст
+
+    Returns:
+        List[str]: Список слов в нижнем регистре
+    """
+    return _WORD_RE.findall(fold(text))
+
+
+def parse_query(query: str) -> List[Tuple[bool, str, bool]]:
+    """Разбирает поисковый запрос на условия.
+
+    Слова с «#» относятся к тегам. Последнее слово ищется по префиксу
+    (его еще набирают), если запрос не заканчивается пробелом.
+
+    Args:
+        query (str): Поисковый запрос, например «раб #дом»
+
+    Returns:
+        List[Tuple[bool, str, bool]]: Условия (это тег, слово, по префиксу)
+    """
+    parts = query.split()
+    typing = bool(parts) and not query[-1].isspace()
+    terms = []
+    for i, part in enumerate(parts):
+        is_prefix = typing and i == len(parts) - 1
+        if part.startswith("#"):
+            tag = fold(part.lstrip("#"))
+            if tag:
+                terms.append((True, tag, is_prefix))
+            continue
+        words = tokenize(part)
+        for j, word in enumerate(words):
+            terms.append((False, word, is_prefix and j == len(words) - 1))
+    return terms
+
+
+def compile_terms(terms: List[Tuple[bool, str, bool]]) -> Callable:
+    """Строит функцию проверки заметок на соответствие разобранному запросу.
+
+    Слова ищутся регулярными выражениями по приведенному тексту заметки
+    с проверкой границ слова, поэтому текст не разбивается на слова
+    целиком — это в несколько раз быстрее, чем tokenize().
+
+    Args:
+        terms (List[Tuple[bool, str, bool]]): Результат parse_query()
+
+    Returns:
+        Callable[[Note], bool]: Функция, возвращающая True, если заметка
+            подходит под все условия
+    """
+    tag_terms = [(term, is_prefix) for is_tag, term, is_prefix in terms if is_tag]
+    patterns = [re.compile(r"(?<!\w)" + re.escape(term) + ("" if is_prefix else r"(?!\w)"))
+                for is_tag, term, is_prefix in terms if not is_tag]
+
+    def matches(note) -> bool:
+        if not terms:
+            return False
+        if tag_terms:
+            tags = [fold(t) for t in note.tags]
+            for term, is_prefix in tag_terms:
+                if not (any(t.startswith(term) for t in tags) if is_prefix else term in tags):
+                    return False
+        if patterns:
+            text = fold(" ".join((note.title, note.peek_content(), *note.tags)))
+            for pattern in patterns:
+                if pattern.search(text) is None:
+                    return False
+        return True
+    return matches
+
+
+def match_note(note, terms: List[Tuple[bool, str, bool]]) -> bool:
+    """Проверяет одну заметку на соответствие разобранному запросу.
+
+    Используется при поиске без индекса, например при потоковом
+    просмотре файла. Для проверки многих заметок одним запросом
+    удобнее compile_terms().
+
+    Args:
+        note (Note): Проверяемая заметка
+        terms (List[Tuple[bool, str, bool]]): Результат parse_query()
+
+    Returns:
+        bool: True, если заметка подходит под все условия
+    """
+    return compile_terms(terms)(note)
+
+
+class _PostingMap:
+    """Отображение «ключ → множество ID» с упорядоченным списком ключей.
+
+    Упорядоченный список нужен для поиска по префиксу через bisect.
+    """
+
+    def __init__(self):
+        """Создает пустое отображение."""
+        self.postings: Dict[str, Set[int]] = {}
+        self.keys: List[str] = []
+
+    def add(self, key: str, note_id: int):
+        """Добавляет ID заметки к ключу."""
+        ids = self.postings.get(key)
+        if ids is None:
+            ids = self.postings[key] = set()
+            insort(self.keys, key)
+        ids.add(note_id)
+
+    def discard(self, key: str, note_id: int):
+        """Убирает ID заметки из ключа, удаляя опустевший ключ."""
+        ids = self.postings.get(key)
+        if ids is None:
+            return
+        ids.discard(note_id)
+        if not ids:
+            del self.postings[key]
+            del self.keys[bisect_left(self.keys, key)]
+
+    def exact(self, key: str) -> Set[int]:
+        """Возвращает ID заметок с точным совпадением ключа."""
+        return self.postings.get(key, set())
+
+    def prefix(self, prefix: str) -> Set[int]:
+        """Возвращает ID заметок для всех ключей с данным префиксом."""
+        start = bisect_left(self.keys, prefix)
+        matches = []
+        for key in self.keys[start:]:
+            if not key.startswith(prefix):
+                break
+            matches.append(self.postings[key])
+        if len(matches) == 1:
+            return matches[0]
+        return set().union(*matches)
+
+
+class SearchIndex:
+    """Инвертированный индекс заметок по словам и тегам.
+
+    Attributes:
+        words (_PostingMap): Слова заголовка и содержания → ID заметок
+        tags (_PostingMap): Теги → ID заметок
+    """
+
+    def __init__(self):
+        """Создает пустой индекс."""
+        self.words = _PostingMap()
+        self.tags = _PostingMap()
+        # Проиндексированные слова и теги каждой заметки — для удаления
+        self._doc_words: Dict[int, Set[str]] = {}
+        self._doc_tags: Dict[int, Set[str]] = {}
+
+    @classmethod
+    def build(cls, notes: Iterable) -> 'SearchIndex':
+        """Строит индекс по набору заметок.
+
+        Args:
+            notes (Iterable[Note]): Заметки для индексации
+
+        Returns:
+            SearchIndex: Заполненный индекс
+        """
+        index = cls()
+        for note in notes:
+            index.add(note)
+        return index
+
+    def add(self, note):
+        """Добавляет или переиндексирует заметку.
+
+        Args:
+            note (Note): Заметка с назначенным ID
+        """
+        self.remove(note.id)
+        words = set(tokenize(note.title)) | set(tokenize(note.peek_content()))
+        for tag in note.tags:
+            words.update(tokenize(tag))
+        tags = {fold(t) for t in note.tags}
+        for word in words:
+            self.words.add(word, note.id)
+        for tag in tags:
+            self.tags.add(tag, note.id)
+        self._doc_words[note.id] = words
+        self._doc_tags[note.id] = tags
+
+    def remove(self, note_id: int):
+        """Удаляет заметку из индекса.
+
+        Args:
+            note_id (int): ID заметки
+        """
+        for word in self._doc_words.pop(note_id, ()):
+            self.words.discard(word, note_id)
+        for tag in self._doc_tags.pop(note_id, ()):
+            self.tags.discard(tag, note_id)
+
+    def search(self, query: str) -> Set[int]:
+        """Ищет заметки, содержащие все слова запроса.
+
+        Слова с «#» ищутся среди тегов. Последнее слово ищется по
+        префиксу (его еще набирают), если запрос не заканчивается пробелом.
+
+        Args:
+            query (str): Поисковый запрос, например «раб #дом»
+
+        Returns:
+            Set[int]: ID найденных заметок
+        """
+        postings = []
+        for is_tag, term, is_prefix in parse_query(query):
+            posting_map = self.tags if is_tag else self.words
+            postings.append(posting_map.prefix(term) if is_prefix else posting_map.exact(term))
+        if not postings:
+            return set()
+        # Пересекаем, начиная с самого короткого списка
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            if not result:
+                break
+            result &= ids
+        return result
+
+    def dump(self, path: str, stamp) -> bool:
+        """Сохраняет индекс в файл.
+
+        Args:
+            path (str): Путь к файлу индекса
+            stamp: Отпечаток файла заметок, которому соответствует индекс
+
+        Returns:
+            bool: True если сохранение успешно, иначе False
+        """
+        data = {
+            "stamp": stamp,
+            "words": {k: sorted(v) for k, v in self.words.postings.items()},
+            "tags": {k: sorted(v) for k, v in self.tags.postings.items()},
+        }
+        try:
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            return True
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи индекса: {e}")
+            return False
+
+    @classmethod
+    def load(cls, path: str, stamp) -> Optional['SearchIndex']:
+        """Загружает индекс из файла, если он соответствует отпечатку.
+
+        Args:
+            path (str): Путь к файлу индекса
+            stamp: Текущий отпечаток файла заметок
+
+        Returns:
+            Optional[SearchIndex]: Индекс или None, если файл устарел или поврежден
+        """
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            return None
+        if data.get("stamp") != json.loads(json.dumps(stamp)):
+            return None
+        index = cls()
+        for attr, doc_map in (("words", index._doc_words), ("tags", index._doc_tags)):
+            posting_map = getattr(index, attr)
+            posting_map.keys = sorted(data[attr])
+            for key, ids in data[attr].items():
+                posting_map.postings[key] = set(ids)
+                for note_id in ids:
+                    doc_map.setdefault(note_id, set()).add(key)
+        return index
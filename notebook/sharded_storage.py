@@ -0,0 +1,417 @@
+"""
+Модуль sharded_storage - хранилище заметок, разделенное на шарды.
+
+Заметки раскладываются по нескольким JSON-файлам в каталоге notes.shards
+по диапазону ID («id») или по месяцу создания («month»). Запись
+перезаписывает только затронутые шарды и небольшой манифест, а при
+холодном старте шарды разбираются параллельно в отдельных процессах.
+
+Файлы в каталоге notes.shards:
+    manifest.json: Схема разбиения, список шардов и следующий свободный ID
+    ids-00000.json, 2024-05.json, ...: Шарды — JSON-массивы заметок
+
+Перераспределение существующего хранилища:
+    python -m notebook.reshard notes.json --scheme month
+"""
+
+import json
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Dict, Iterator, List, Optional, Tuple
+from .models import Note
+from .profiling import timed
+from .storage import Storage, NOTES_FILE
+
+SCHEMES = ("id", "month")
+# Число заметок в шарде при разбиении по ID
+SHARD_SIZE = 10000
+# Разбирать шарды в отдельных процессах, только если их суммарный
+# размер больше этого порога: запуск процессов тоже стоит времени
+PARALLEL_MIN_BYTES = 8 * 1024 * 1024
+MANIFEST_FILE = "manifest.json"
+
+
+def _read_shard(path: str) -> List[Dict]:
+    """Читает один шард (выполняется и в дочерних процессах).
+
+    Args:
+        path (str): Путь к файлу шарда
+
+    Returns:
+        List[Dict]: Заметки шарда в виде словарей
+    """
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except FileNotFoundError:
+        return []
+    except (json.JSONDecodeError, PermissionError) as e:
+        print(f"Ошибка при чтении шарда {path}: {e}")
+        return []
+
+
+class ShardedStorage(Storage):
+    """Хранилище заметок, разделенное на шарды.
+
+    Имеет тот же интерфейс, что и Storage. При первом открытии
+    существующий notes.json раскладывается по шардам, сам файл
+    остается нетронутым.
+
+    Attributes:
+        file_path (str): Путь к исходному файлу заметок
+        shard_dir (str): Каталог с шардами и манифестом
+        scheme (str): Схема разбиения — «id» или «month»
+        shard_size (int): Число ID в шарде при разбиении по ID
+        workers (Optional[int]): Число процессов для параллельной загрузки
+    """
+
+    def __init__(self, file_path: str = NOTES_FILE, scheme: str = "id",
+                 shard_size: int = SHARD_SIZE, workers: Optional[int] = None,
+                 persist_index: bool = False):
+        """Инициализирует хранилище.
+
+        Args:
+            file_path (str, optional): Путь к файлу заметок. Defaults to NOTES_FILE.
+            scheme (str, optional): Схема разбиения для нового хранилища;
+                у существующего берется из манифеста. Defaults to "id".
+            shard_size (int, optional): Размер шарда по ID. Defaults to SHARD_SIZE.
+            workers (int, optional): Число процессов загрузки; по умолчанию
+                по числу ядер. Defaults to None.
+            persist_index (bool, optional): Сохранять поисковый индекс. Defaults to False.
+
+        Raises:
+            ValueError: Если схема разбиения неизвестна
+        """
+        super().__init__(file_path, persist_index)
+        if scheme not in SCHEMES:
+            raise ValueError(f"Неизвестная схема разбиения: {scheme} (доступны: {', '.join(SCHEMES)})")
+        self.shard_dir = os.path.splitext(file_path)[0] + ".shards"
+        self.manifest_path = os.path.join(self.shard_dir, MANIFEST_FILE)
+        self.scheme = scheme
+        self.shard_size = shard_size
+        self.workers = workers
+        # ID заметки → шард и состав шардов (ID в порядке хранения)
+        self._shard_of: Dict[int, str] = {}
+        self._members: Dict[str, Dict[int, None]] = {}
+        self._manifest_next_id = 0
+        self._convert_legacy()
+
+    def _convert_legacy(self):
+        """Раскладывает существующий notes.json по шардам при первом открытии."""
+        if os.path.exists(self.manifest_path):
+            self._read_manifest()
+            return
+        os.makedirs(self.shard_dir, exist_ok=True)
+        notes = [Note.from_dict(item) for item in super()._load_notes()]
+        self._next_id = max(super()._read_counter(), max((n.id for n in notes), default=0) + 1)
+        self._rewrite_all(notes)
+
+    def shard_key(self, note: Note) -> str:
+        """Возвращает имя шарда для заметки.
+
+        Args:
+            note (Note): Заметка с назначенным ID
+
+        Returns:
+            str: Имя шарда без расширения
+        """
+        if self.scheme == "month":
+            return note.created_at[:7]
+        return f"ids-{note.id // self.shard_size:05d}"
+
+    @property
+    def shards(self) -> List[str]:
+        """Имена непустых шардов по состоянию на последнее чтение."""
+        with self._write_lock:
+            self._get_cache()
+            return sorted(self._members)
+
+    def _shard_path(self, key: str) -> str:
+        """Путь к файлу шарда."""
+        return os.path.join(self.shard_dir, key + ".json")
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Возвращает отпечаток манифеста (он переписывается при каждой записи).
+
+        Returns:
+            Optional[Tuple[int, int, int]]: (mtime в нс, размер, inode) или None
+        """
+        try:
+            st = os.stat(self.manifest_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _read_manifest(self) -> List[str]:
+        """Читает манифест и возвращает список шардов.
+
+        Returns:
+            List[str]: Имена шардов
+        """
+        try:
+            with open(self.manifest_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return []
+        except (json.JSONDecodeError, PermissionError) as e:
+            print(f"Ошибка при чтении манифеста: {e}")
+            return []
+        self.scheme = data["scheme"]
+        self.shard_size = data.get("shard_size", SHARD_SIZE)
+        self._manifest_next_id = data.get("next_id", 0)
+        return data["shards"]
+
+    def _write_manifest(self, shards) -> bool:
+        """Атомарно записывает манифест.
+
+        Args:
+            shards (Iterable[str]): Имена непустых шардов
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        data = {
+            "scheme": self.scheme,
+            "shard_size": self.shard_size,
+            "next_id": self._next_id,
+            "shards": sorted(shards),
+        }
+        return self._write_json(self.manifest_path, data)
+
+    @staticmethod
+    def _write_json(path: str, data) -> bool:
+        """Атомарно записывает JSON (временный файл + os.replace).
+
+        Args:
+            path (str): Путь к файлу
+            data: Данные для записи
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        tmp_path = path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, path)
+            return True
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи в файл: {e}")
+            return False
+
+    def _load_shards(self, shards: List[str]) -> List[List[Dict]]:
+        """Читает шарды, при большом объеме — параллельно в нескольких процессах.
+
+        Args:
+            shards (List[str]): Имена шардов
+
+        Returns:
+            List[List[Dict]]: Содержимое шардов в том же порядке
+        """
+        paths = [self._shard_path(key) for key in shards]
+        total = 0
+        for path in paths:
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        workers = self.workers or os.cpu_count() or 1
+        if len(paths) < 2 or total < PARALLEL_MIN_BYTES or workers < 2:
+            return [_read_shard(path) for path in paths]
+        # spawn, а не fork: хранилище может работать в потоке рядом с Tk
+        context = multiprocessing.get_context("spawn")
+        try:
+            with ProcessPoolExecutor(max_workers=min(workers, len(paths)), mp_context=context) as pool:
+                return list(pool.map(_read_shard, paths))
+        except (BrokenProcessPool, OSError) as e:
+            print(f"Параллельная загрузка недоступна, шарды читаются по очереди: {e}")
+            return [_read_shard(path) for path in paths]
+
+    def _iter_items(self) -> Iterator[Dict]:
+        """Возвращает записи хранилища для построения заметок.
+
+        Yields:
+            Dict: Записи, из которых _make_note() создает заметки
+        """
+        return iter(self._load_notes())
+
+    def _load_notes(self) -> List[Dict]:
+        """Читает все шарды и объединяет их.
+
+        Returns:
+            List[Dict]: Список заметок в виде словарей
+        """
+        shards = self._read_manifest()
+        merged: Dict[int, Dict] = {}
+        shard_of = {}
+        members = {}
+        for key, items in zip(shards, self._load_shards(shards)):
+            members[key] = dict.fromkeys(item["id"] for item in items)
+            for item in items:
+                # Заметка, прерванная при переносе между шардами, берется из последнего
+                previous = shard_of.get(item["id"])
+                if previous is not None and previous != key:
+                    members[previous].pop(item["id"], None)
+                merged[item["id"]] = item
+                shard_of[item["id"]] = key
+        self._shard_of = shard_of
+        self._members = members
+        return list(merged.values())
+
+    def _read_counter(self) -> int:
+        """Возвращает следующий свободный ID из манифеста.
+
+        Returns:
+            int: Следующий ID или 0, если он не сохранен
+        """
+        return self._manifest_next_id
+
+    def _keep_counter(self, deleted: List[int]) -> bool:
+        """Счетчик ID записывается вместе с манифестом."""
+        return True
+
+    @timed()
+    def get(self, note_id: int) -> Optional[Note]:
+        """Возвращает заметку по ID.
+
+        При разбиении по ID и неактуальном кэше читается только
+        шард, в котором может находиться заметка.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Note]: Заметка или None, если не найдена
+        """
+        if self._cache_is_fresh() or self.scheme != "id":
+            return super().get(note_id)
+        key = f"ids-{note_id // self.shard_size:05d}"
+        for item in _read_shard(self._shard_path(key)):
+            if item["id"] == note_id:
+                return self._make_note(item)
+        return None
+
+    def _write_shard(self, key: str, notes: List[Note]) -> bool:
+        """Перезаписывает один шард или удаляет его, если он опустел.
+
+        Args:
+            key (str): Имя шарда
+            notes (List[Note]): Заметки шарда в порядке хранения
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        data = [note.to_dict() for note in notes]
+        if data:
+            return self._write_json(self._shard_path(key), data)
+        try:
+            os.remove(self._shard_path(key))
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            print(f"Ошибка при удалении шарда: {e}")
+            return False
+        return True
+
+    @timed()
+    def _write_batch(self, puts: List[Note], deletes: List[int]) -> bool:
+        """Перезаписывает только шарды, затронутые пакетом изменений.
+
+        Args:
+            puts (List[Note]): Добавленные и обновленные заметки с ID
+            deletes (List[int]): ID удаляемых заметок
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        members = {}
+
+        def shard(key):
+            if key not in members:
+                members[key] = dict(self._members.get(key, {}))
+            return members[key]
+
+        shard_of = {}
+        for note_id in deletes:
+            shard(self._shard_of[note_id]).pop(note_id, None)
+        for note in puts:
+            key = self.shard_key(note)
+            previous = self._shard_of.get(note.id)
+            if previous is not None:
+                shard(previous).pop(note.id, None)
+            shard(key)[note.id] = None
+            shard_of[note.id] = key
+
+        # Кэш обновляется после записи, поэтому новые версии берутся из пакета
+        pending = {note.id: note for note in puts}
+        for key, ids in members.items():
+            notes = [pending.get(note_id) or self._notes[note_id] for note_id in ids]
+            if not self._write_shard(key, notes):
+                return False
+
+        self._members.update(members)
+        for key, ids in members.items():
+            if not ids:
+                del self._members[key]
+        self._shard_of.update(shard_of)
+        for note_id in deletes:
+            self._shard_of.pop(note_id, None)
+        return self._write_manifest(self._members)
+
+    def _rewrite_all(self, notes: List[Note]) -> bool:
+        """Раскладывает заметки по шардам заново по текущей схеме.
+
+        Args:
+            notes (List[Note]): Все заметки в порядке хранения
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        old_shards = set(self._members)
+        shards: Dict[str, List[Note]] = {}
+        for note in notes:
+            shards.setdefault(self.shard_key(note), []).append(note)
+        for key, shard_notes in shards.items():
+            if not self._write_shard(key, shard_notes):
+                return False
+        if not self._write_manifest(shards):
+            return False
+        # Старые шарды удаляются только после записи нового манифеста
+        for key in old_shards - shards.keys():
+            try:
+                os.remove(self._shard_path(key))
+            except OSError:
+                pass
+        self.invalidate()
+        return True
+
+    def reshard(self, scheme: str, shard_size: int = SHARD_SIZE) -> bool:
+        """Перераспределяет заметки по новой схеме разбиения.
+
+        Args:
+            scheme (str): «id» или «month»
+            shard_size (int, optional): Размер шарда по ID. Defaults to SHARD_SIZE.
+
+        Returns:
+            bool: True если перераспределение успешно, иначе False
+
+        Raises:
+            ValueError: Если схема разбиения неизвестна
+        """
+        if scheme not in SCHEMES:
+            raise ValueError(f"Неизвестная схема разбиения: {scheme} (доступны: {', '.join(SCHEMES)})")
+        with self._writing() as locked:
+            if not locked:
+                return False
+            notes = self.get_all()
+            previous = self.scheme, self.shard_size
+            self.scheme, self.shard_size = scheme, shard_size
+            # Шарды с тем же именем, но другим составом, перезаписываются целиком
+            if not self._rewrite_all(notes):
+                self.scheme, self.shard_size = previous
+                return False
+            self._bump_version()
+        return True
+
@@ -0,0 +1,304 @@
+"""
+Модуль split_storage - хранилище с раздельными метаданными и содержанием.
+
+Компактный индекс метаданных (ID, заголовок, теги, приоритет, статус,
+дата и положение текста, а также следующий свободный ID) хранится
+в notes.meta.json, а тексты заметок — подряд в отдельном файле
+содержания. Содержание читается по смещению
+через mmap только при первом обращении к Note.content, поэтому память
+и время обновления списка зависят от объема метаданных, а не текстов.
+
+Файл содержания только дописывается; старые версии текстов удаляются
+уплотнением, которое пишет новый файл и атомарно переключает на него
+индекс метаданных.
+"""
+
+import json
+import mmap
+import os
+from typing import Dict, Iterator, List, Optional, Tuple
+from .models import Note
+from .storage import Storage, NOTES_FILE
+from .profiling import PROFILER, timed
+
+# Уплотнять файл содержания, когда мусора в нем больше живых текстов
+# и больше этого размера в байтах
+COMPACT_GARBAGE_BYTES = 1024 * 1024
+
+
+class SplitStorage(Storage):
+    """Хранилище с ленивой загрузкой содержания заметок.
+
+    Имеет тот же интерфейс, что и Storage. При первом открытии
+    существующий notes.json разделяется на метаданные и содержание,
+    сам файл остается нетронутым.
+
+    Attributes:
+        file_path (str): Путь к исходному файлу заметок
+        meta_path (str): Путь к индексу метаданных
+    """
+
+    def __init__(self, file_path: str = NOTES_FILE, persist_index: bool = False):
+        """Инициализирует хранилище.
+
+        Args:
+            file_path (str, optional): Путь к файлу заметок. Defaults to NOTES_FILE.
+            persist_index (bool, optional): Сохранять поисковый индекс. Defaults to False.
+        """
+        super().__init__(file_path, persist_index)
+        self._base = os.path.splitext(file_path)[0]
+        self.meta_path = self._base + ".meta.json"
+        # Имя текущего файла содержания (меняется при уплотнении)
+        self._content_name: Optional[str] = None
+        # ID заметки → (смещение, длина) текста в файле содержания
+        self._locations: Dict[int, Tuple[int, int]] = {}
+        # Следующий свободный ID, сохраненный в индексе метаданных
+        self._meta_next_id = 0
+        self._mmap: Optional[mmap.mmap] = None
+        self._mmap_file = None
+        self._convert_legacy()
+
+    @property
+    def content_path(self) -> str:
+        """Путь к текущему файлу содержания."""
+        name = self._content_name or os.path.basename(self._base) + ".0.content"
+        return os.path.join(os.path.dirname(self.meta_path), name)
+
+    def _convert_legacy(self):
+        """Разделяет существующий notes.json при первом открытии."""
+        if os.path.exists(self.meta_path) or not os.path.exists(self.file_path):
+            return
+        self._notes = {}
+        notes = [Note.from_dict(item) for item in super()._load_notes()]
+        self._next_id = super()._read_counter()
+        self._write_batch(notes, [])
+        self._notes = None
+
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Возвращает отпечаток индекса метаданных.
+
+        Returns:
+            Optional[Tuple[int, int, int]]: (mtime в нс, размер, inode) или None
+        """
+        try:
+            st = os.stat(self.meta_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _iter_items(self) -> Iterator[Dict]:
+        """Возвращает записи хранилища для построения заметок.
+
+        Yields:
+            Dict: Записи, из которых _make_note() создает заметки
+        """
+        return iter(self._load_notes())
+
+    def _load_notes(self) -> List[Dict]:
+        """Читает индекс метаданных.
+
+        Returns:
+            List[Dict]: Метаданные заметок с положением текста
+        """
+        self._close_mmap()
+        self._locations = {}
+        if not os.path.exists(self.meta_path):
+            return []
+        try:
+            with open(self.meta_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except (json.JSONDecodeError, PermissionError) as e:
+            print(f"Ошибка при чтении файла: {e}")
+            return []
+        self._content_name = data["content_file"]
+        self._meta_next_id = data.get("next_id", 0)
+        for item in data["notes"]:
+            self._locations[item["id"]] = (item["offset"], item["length"])
+        return data["notes"]
+
+    def _read_counter(self) -> int:
+        """Возвращает следующий свободный ID из индекса метаданных.
+
+        Returns:
+            int: Следующий ID или 0, если он не сохранен
+        """
+        return self._meta_next_id
+
+    def _keep_counter(self, deleted: List[int]) -> bool:
+        """Счетчик ID записывается вместе с индексом метаданных."""
+        return True
+
+    def _make_note(self, item: Dict) -> Note:
+        """Создает заметку с ленивой загрузкой содержания.
+
+        Args:
+            item (Dict): Метаданные заметки
+
+        Returns:
+            Note: Объект заметки без загруженного содержания
+        """
+        note_id = item["id"]
+        return Note.from_metadata(item, lambda: self._read_content(note_id))
+
+    def _read_content(self, note_id: int) -> str:
+        """Читает текст заметки из файла содержания.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            str: Содержание заметки
+        """
+        offset, length = self._locations[note_id]
+        if length == 0:
+            return ""
+        if self._mmap is None or offset + length > len(self._mmap):
+            self._open_mmap()
+        return self._mmap[offset:offset + length].decode('utf-8')
+
+    def _open_mmap(self):
+        """Отображает файл содержания в память."""
+        self._close_mmap()
+        self._mmap_file = open(self.content_path, 'rb')
+        self._mmap = mmap.mmap(self._mmap_file.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def _close_mmap(self):
+        """Закрывает отображение файла содержания."""
+        if self._mmap is not None:
+            self._mmap.close()
+            self._mmap = None
+        if self._mmap_file is not None:
+            self._mmap_file.close()
+            self._mmap_file = None
+
+    @staticmethod
+    def _meta_dict(note: Note, location: Tuple[int, int]) -> Dict:
+        """Формирует запись индекса метаданных без содержания.
+
+        Args:
+            note (Note): Объект заметки
+            location (Tuple[int, int]): Смещение и длина текста
+
+        Returns:
+            Dict: Запись индекса метаданных
+        """
+        return {
+            "id": note.id,
+            "title": note.title,
+            "priority": note.priority,
+            "status": note.status,
+            "tags": note.tags,
+            "created_at": note.created_at,
+            "offset": location[0],
+            "length": location[1],
+        }
+
+    def _write_meta(self, notes: List[Note], locations: Dict[int, Tuple[int, int]]) -> bool:
+        """Атомарно записывает индекс метаданных.
+
+        Args:
+            notes (List[Note]): Заметки в порядке хранения
+            locations (Dict[int, Tuple[int, int]]): Положение текстов
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        data = {
+            "content_file": os.path.basename(self.content_path),
+            "next_id": self._next_id,
+            "notes": [self._meta_dict(n, locations[n.id]) for n in notes],
+        }
+        tmp_path = self.meta_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+            os.replace(tmp_path, self.meta_path)
+            return True
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи в файл: {e}")
+            return False
+
+    @timed()
+    def _write_batch(self, puts: List[Note], deletes: List[int]) -> bool:
+        """Дописывает новые тексты и перезаписывает только метаданные.
+
+        Тексты заметок, содержание которых не загружалось (а значит,
+        не менялось), повторно не пишутся.
+
+        Args:
+            puts (List[Note]): Добавленные и обновленные заметки с ID
+            deletes (List[int]): ID удаляемых заметок
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        locations = dict(self._locations)
+        try:
+            with open(self.content_path, 'ab') as f:
+                offset = start = f.tell()
+                for note in puts:
+                    if not note.content_loaded and note.id in locations:
+                        continue
+                    body = note.content.encode('utf-8')
+                    f.write(body)
+                    locations[note.id] = (offset, len(body))
+                    offset += len(body)
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи в файл: {e}")
+            return False
+        if PROFILER.enabled:
+            PROFILER.add_bytes("SplitStorage._write_batch", offset - start)
+        changed = {n.id for n in puts}.union(deletes)
+        notes = [n for n in self._notes.values() if n.id not in changed] + puts
+        for note_id in deletes:
+            locations.pop(note_id, None)
+        if not self._write_meta(notes, locations):
+            return False
+        self._locations = locations
+        self._maybe_compact(notes, offset)
+        return True
+
+    def _maybe_compact(self, notes: List[Note], file_size: int):
+        """Переписывает файл содержания без устаревших текстов.
+
+        Args:
+            notes (List[Note]): Текущие заметки в порядке хранения
+            file_size (int): Текущий размер файла содержания
+        """
+        live = sum(length for _, length in self._locations.values())
+        garbage = file_size - live
+        if garbage < COMPACT_GARBAGE_BYTES or garbage < live:
+            return
+        old_path = self.content_path
+        generation = int(old_path.rsplit('.', 2)[-2]) + 1
+        new_name = f"{os.path.basename(self._base)}.{generation}.content"
+        new_path = os.path.join(os.path.dirname(self.meta_path), new_name)
+        locations = {}
+        try:
+            with open(old_path, 'rb') as src, open(new_path, 'wb') as dst:
+                for note in notes:
+                    offset, length = self._locations[note.id]
+                    src.seek(offset)
+                    locations[note.id] = (dst.tell(), length)
+                    dst.write(src.read(length))
+                dst.flush()
+                os.fsync(dst.fileno())
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при уплотнении файла содержания: {e}")
+            return
+        previous = self._content_name
+        self._content_name = new_name
+        if not self._write_meta(notes, locations):
+            self._content_name = previous
+            return
+        self._locations = locations
+        self._close_mmap()
+        try:
+            os.remove(old_path)
+        except OSError:
+            pass
+
+    def close(self):
+        """Закрывает файл содержания и сохраняет индекс."""
+        self._close_mmap()
+        super().close()
@@ -0,0 +1,486 @@
+"""
+Модуль sqlite_storage - хранилище заметок в базе SQLite.
+
+Заметки хранятся в индексированной таблице, теги — в отдельной таблице
+для выборки по тегу, а заголовок, содержание и теги — в виртуальной
+таблице FTS5 для полнотекстового поиска. Используется только
+стандартный модуль sqlite3.
+"""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, Iterator, List, Optional, Union
+from .models import Note
+from .query import to_iso, value_set, sort_key, PRIORITY_RANK, STATUS_RANK
+from .search_index import fold, parse_query
+from .storage import Storage, NOTES_FILE, DB_FILE, iter_import, export_notes
+from .profiling import timed
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS notes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    title TEXT NOT NULL,
+    content TEXT NOT NULL,
+    priority TEXT NOT NULL,
+    status TEXT NOT NULL,
+    tags TEXT NOT NULL,
+    created_at TEXT NOT NULL,
+    seq INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS notes_priority ON notes(priority);
+CREATE INDEX IF NOT EXISTS notes_status ON notes(status);
+CREATE INDEX IF NOT EXISTS notes_created_at ON notes(created_at);
+CREATE INDEX IF NOT EXISTS notes_seq ON notes(seq);
+CREATE INDEX IF NOT EXISTS notes_priority_order ON notes({priority_rank}, created_at, id);
+CREATE INDEX IF NOT EXISTS notes_status_order ON notes({status_rank}, created_at, id);
+CREATE TABLE IF NOT EXISTS note_tags (
+    note_id INTEGER NOT NULL REFERENCES notes(id) ON DELETE CASCADE,
+    tag TEXT NOT NULL,
+    PRIMARY KEY (tag, note_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS note_tags_note ON note_tags(note_id);
+CREATE VIRTUAL TABLE IF NOT EXISTS notes_fts USING fts5(
+    title, content, tags, tokenize = 'unicode61 remove_diacritics 2'
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+"""
+
+
+def _rank_sql(column: str, ranks) -> str:
+    """Возвращает выражение SQL с рангом значения колонки для сортировки."""
+    cases = " ".join(f"WHEN '{value}' THEN {rank}" for value, rank in ranks.items())
+    return f"(CASE {column} {cases} ELSE -1 END)"
+
+
+# Выражения ORDER BY для Storage.order_by(); приоритет и статус
+# сортируются по индексам выражений, заголовок — с приведением регистра
+_ORDER_SQL = {
+    "id": ("id",),
+    "title": ("title COLLATE fold", "id"),
+    "priority": (_rank_sql("priority", PRIORITY_RANK), "created_at", "id"),
+    "status": (_rank_sql("status", STATUS_RANK), "created_at", "id"),
+    "created": ("created_at", "id"),
+}
+_SCHEMA = _SCHEMA.format(priority_rank=_ORDER_SQL["priority"][0],
+                         status_rank=_ORDER_SQL["status"][0])
+
+_COLUMNS = "id, title, content, priority, status, tags, created_at"
+_SELECT_ALL = f"SELECT {_COLUMNS} FROM notes ORDER BY seq"
+_SELECT_ONE = f"SELECT {_COLUMNS} FROM notes WHERE id = ?"
+_NEXT_SEQ = "SELECT COALESCE(MAX(seq), 0) + 1 FROM notes"
+_INSERT = ("INSERT INTO notes (title, content, priority, status, tags, created_at, seq) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?)")
+_UPSERT = ("INSERT OR REPLACE INTO notes (id, title, content, priority, status, tags, created_at, seq) "
+           "VALUES (?, ?, ?, ?, ?, ?, ?, ?)")
+_DELETE = "DELETE FROM notes WHERE id = ?"
+_DELETE_TAGS = "DELETE FROM note_tags WHERE note_id = ?"
+_INSERT_TAG = "INSERT OR IGNORE INTO note_tags (note_id, tag) VALUES (?, ?)"
+_DELETE_FTS = "DELETE FROM notes_fts WHERE rowid = ?"
+_INSERT_FTS = "INSERT INTO notes_fts (rowid, title, content, tags) VALUES (?, ?, ?, ?)"
+
+
+def _row_to_note(row) -> Note:
+    """Создает объект Note из строки таблицы notes.
+
+    Args:
+        row (tuple): Значения колонок _COLUMNS
+
+    Returns:
+        Note: Объект заметки
+    """
+    return Note.from_dict({
+        "id": row[0], "title": row[1], "content": row[2], "priority": row[3],
+        "status": row[4], "tags": json.loads(row[5]), "created_at": row[6],
+    })
+
+
+class SqliteStorage:
+    """Хранилище заметок в базе SQLite с полнотекстовым поиском FTS5.
+
+    Имеет тот же интерфейс, что и Storage (get_all/save/delete),
+    а также get, query и search.
+
+    Attributes:
+        db_path (str): Путь к файлу базы данных
+        json_path (str): Путь к notes.json для однократного переноса
+            (относительный путь отсчитывается от каталога базы)
+    """
+
+    def __init__(self, db_path: str = DB_FILE, json_path: Optional[str] = NOTES_FILE):
+        """Открывает базу данных и при первом открытии переносит notes.json.
+
+        Args:
+            db_path (str, optional): Путь к базе. Defaults to DB_FILE.
+            json_path (str, optional): Путь к notes.json для переноса; относительный
+                путь отсчитывается от каталога базы, None отключает перенос.
+                Defaults to NOTES_FILE.
+        """
+        self.db_path = db_path
+        # Перенос берет notes.json рядом с базой, а не из текущего каталога
+        self.json_path = os.path.join(os.path.dirname(db_path), json_path) if json_path else json_path
+        self._lock = threading.RLock()
+        # Соединение используется и из фонового потока NoteApp — доступ под блокировкой
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("PRAGMA foreign_keys=ON")
+        # Сравнение заголовков без учета регистра, как в search_index.fold
+        self._conn.create_collation("fold", lambda a, b: (fold(a) > fold(b)) - (fold(a) < fold(b)))
+        self._conn.executescript(_SCHEMA)
+        # Номер версии заметок (см. generation) и последнее значение data_version
+        self._generation = 0
+        self._data_version = None
+        self._migrate_json()
+
+    def _migrate_json(self):
+        """Однократно переносит заметки из notes.json, сохраняя их ID."""
+        if not self.json_path or not os.path.exists(self.json_path):
+            return
+        with self._lock:
+            done = self._conn.execute("SELECT 1 FROM meta WHERE key = 'migrated_from'").fetchone()
+            if done:
+                return
+            notes = Storage(self.json_path).get_all()
+            with self._conn:
+                for note in notes:
+                    self._write(note)
+                self._conn.execute("INSERT INTO meta (key, value) VALUES ('migrated_from', ?)",
+                                   (os.path.abspath(self.json_path),))
+
+    def _write(self, note: Note):
+        """Записывает заметку во все таблицы (внутри открытой транзакции).
+
+        Args:
+            note (Note): Заметка; при отсутствии ID он назначается базой
+        """
+        seq = self._conn.execute(_NEXT_SEQ).fetchone()[0]
+        tags_json = json.dumps(note.tags, ensure_ascii=False)
+        if note.id is None:
+            cur = self._conn.execute(_INSERT, (note.title, note.content, note.priority, note.status,
+                                               tags_json, note.created_at, seq))
+            note.id = cur.lastrowid
+        else:
+            self._conn.execute(_DELETE_TAGS, (note.id,))
+            self._conn.execute(_DELETE_FTS, (note.id,))
+            self._conn.execute(_UPSERT, (note.id, note.title, note.content, note.priority,
+                                         note.status, tags_json, note.created_at, seq))
+        self._conn.executemany(_INSERT_TAG, [(note.id, fold(t)) for t in note.tags])
+        # В FTS пишется приведенный текст: unicode61 не сводит «ё» к «е»
+        self._conn.execute(_INSERT_FTS, (note.id, fold(note.title), fold(note.content),
+                                         fold(" ".join(note.tags))))
+
+    @timed()
+    def get_all(self) -> List[Note]:
+        """Возвращает все заметки как объекты Note.
+
+        Returns:
+            List[Note]: Список объектов Note в порядке сохранения
+        """
+        with self._lock:
+            return [_row_to_note(row) for row in self._conn.execute(_SELECT_ALL)]
+
+    def iter_notes(self) -> Iterator[Note]:
+        """Последовательно возвращает заметки, читая их из базы порциями.
+
+        Yields:
+            Note: Заметки в порядке сохранения
+        """
+        with self._lock:
+            cur = self._conn.cursor()
+            cur.execute(_SELECT_ALL)
+            rows = cur.fetchmany()
+        while rows:
+            for row in rows:
+                yield _row_to_note(row)
+            with self._lock:
+                rows = cur.fetchmany(256)
+
+    def count(self) -> int:
+        """Возвращает число заметок.
+
+        Returns:
+            int: Число заметок в базе
+        """
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM notes").fetchone()[0]
+
+    def export(self, path: Union[str, os.PathLike]) -> int:
+        """Потоково выгружает заметки в JSON-массив или JSON Lines (.jsonl).
+
+        Args:
+            path (Union[str, os.PathLike]): Путь к файлу экспорта
+
+        Returns:
+            int: Число выгруженных заметок
+        """
+        return export_notes(self.iter_notes(), path)
+
+    def get(self, note_id: int) -> Optional[Note]:
+        """Возвращает заметку по ID.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Note]: Заметка или None, если не найдена
+        """
+        with self._lock:
+            row = self._conn.execute(_SELECT_ONE, (note_id,)).fetchone()
+        return _row_to_note(row) if row else None
+
+    def save(self, note: Note) -> bool:
+        """Сохраняет одну заметку (добавляет или обновляет).
+
+        Args:
+            note (Note): Объект заметки для сохранения
+
+        Returns:
+            bool: True если сохранение успешно, иначе False
+        """
+        return self.save_many([note])[0]
+
+    @timed()
+    def save_many(self, notes: Iterable[Note]) -> List[bool]:
+        """Сохраняет пакет заметок в одной транзакции.
+
+        Args:
+            notes (Iterable[Note]): Заметки для добавления или обновления
+
+        Returns:
+            List[bool]: Результат для каждой заметки в порядке передачи
+        """
+        notes = list(notes)
+        with self._lock:
+            try:
+                with self._conn:
+                    for note in notes:
+                        self._write(note)
+                self._generation += 1
+                return [True] * len(notes)
+            except sqlite3.Error as e:
+                print(f"Ошибка при записи в базу: {e}")
+                return [False] * len(notes)
+
+    def delete(self, note_id: int) -> bool:
+        """Удаляет заметку по ID.
+
+        Args:
+            note_id (int): ID заметки для удаления
+
+        Returns:
+            bool: True если удаление успешно, иначе False
+        """
+        return self.delete_many([note_id])[0]
+
+    @timed()
+    def delete_many(self, note_ids: Iterable[int]) -> List[bool]:
+        """Удаляет пакет заметок в одной транзакции.
+
+        Args:
+            note_ids (Iterable[int]): ID заметок для удаления
+
+        Returns:
+            List[bool]: Для каждого ID — True, если заметка удалена;
+                False, если она не найдена или запись не удалась
+        """
+        note_ids = list(note_ids)
+        deleted = set()
+        with self._lock:
+            try:
+                with self._conn:
+                    for note_id in dict.fromkeys(note_ids):
+                        if self._conn.execute(_DELETE, (note_id,)).rowcount:
+                            self._conn.execute(_DELETE_TAGS, (note_id,))
+                            self._conn.execute(_DELETE_FTS, (note_id,))
+                            deleted.add(note_id)
+            except sqlite3.Error as e:
+                print(f"Ошибка при записи в базу: {e}")
+                return [False] * len(note_ids)
+            if deleted:
+                self._generation += 1
+        return [i in deleted for i in note_ids]
+
+    def import_from(self, source: Union[str, os.PathLike, Iterable]) -> List[Optional[int]]:
+        """Импортирует заметки как новые в одной транзакции.
+
+        Args:
+            source (Union[str, os.PathLike, Iterable]): Путь к JSON-массиву
+                или файлу JSON Lines (.jsonl), либо итерируемый набор
+                словарей или объектов Note
+
+        Returns:
+            List[Optional[int]]: Назначенный ID для каждого элемента
+                или None, если элемент некорректен или запись не удалась
+        """
+        notes = list(iter_import(source))
+        valid = [note for note in notes if note is not None]
+        saved = dict(zip(map(id, valid), self.save_many(valid)))
+        return [note.id if note is not None and saved[id(note)] else None for note in notes]
+
+    @staticmethod
+    def _text_condition(text: str, where: list, params: list):
+        """Добавляет условие полнотекстового поиска.
+
+        Слова ищутся через FTS5 (последнее — по префиксу, если запрос
+        не заканчивается пробелом), слова с «#» — среди тегов.
+
+        Args:
+            text (str): Поисковый запрос
+            where (list): Список условий WHERE, дополняется
+            params (list): Параметры запроса, дополняются
+        """
+        terms = []
+        for is_tag, term, is_prefix in parse_query(text):
+            if not is_tag:
+                terms.append(f'"{term}"*' if is_prefix else f'"{term}"')
+            elif is_prefix:
+                where.append("id IN (SELECT note_id FROM note_tags WHERE tag >= ? AND tag < ?)")
+                params.extend([term, term + "\U0010ffff"])
+            else:
+                where.append("id IN (SELECT note_id FROM note_tags WHERE tag = ?)")
+                params.append(term)
+        if terms:
+            where.append("id IN (SELECT rowid FROM notes_fts WHERE notes_fts MATCH ?)")
+            params.append(" ".join(terms))
+
+    @timed()
+    def query(self, tags=None, priority=None, status=None,
+              created_between=None, text: Optional[str] = None) -> List[Note]:
+        """Выбирает заметки по условиям на поля, используя индексы базы.
+
+        Args:
+            tags (Union[str, Iterable[str]], optional): Теги, все обязательны
+            priority (Union[str, Iterable[str]], optional): Допустимые приоритеты
+            status (Union[str, Iterable[str]], optional): Допустимые статусы
+            created_between (Tuple, optional): Диапазон дат создания [start, end)
+            text (str, optional): Поисковый запрос, как в search()
+
+        Returns:
+            List[Note]: Подходящие заметки в порядке возрастания ID
+        """
+        where, params = [], []
+        if tags is not None:
+            for tag in value_set(tags):
+                where.append("id IN (SELECT note_id FROM note_tags WHERE tag = ?)")
+                params.append(fold(tag))
+        for column, value in (("priority", priority), ("status", status)):
+            if value is not None:
+                values = sorted(value_set(value))
+                where.append(f"{column} IN ({', '.join('?' * len(values))})")
+                params.extend(values)
+        if created_between is not None:
+            start, end = (to_iso(b) for b in created_between)
+            if start is not None:
+                where.append("created_at >= ?")
+                params.append(start)
+            if end is not None:
+                where.append("created_at < ?")
+                params.append(end)
+        if text is not None:
+            self._text_condition(text, where, params)
+        sql = f"SELECT {_COLUMNS} FROM notes"
+        if where:
+            sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id"
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                print(f"Ошибка при чтении базы: {e}")
+                return []
+        return [_row_to_note(row) for row in rows]
+
+    @timed()
+    def order_by(self, field: str = "created", descending: bool = False,
+                 limit: Optional[int] = None) -> List[Note]:
+        """Возвращает заметки, упорядоченные по полю, используя индексы базы.
+
+        Args:
+            field (str, optional): Поле из SORT_FIELDS (id, title, priority,
+                status, created). Defaults to "created".
+            descending (bool, optional): По убыванию. Defaults to False.
+            limit (int, optional): Не больше указанного числа заметок
+
+        Returns:
+            List[Note]: Заметки в заданном порядке
+        """
+        sort_key(field)  # Проверка имени поля
+        direction = " DESC" if descending else ""
+        sql = f"SELECT {_COLUMNS} FROM notes ORDER BY " + \
+            ", ".join(expr + direction for expr in _ORDER_SQL[field])
+        params = []
+        if limit is not None:
+            sql += " LIMIT ?"
+            params.append(limit)
+        with self._lock:
+            try:
+                rows = self._conn.execute(sql, params).fetchall()
+            except sqlite3.Error as e:
+                print(f"Ошибка при чтении базы: {e}")
+                return []
+        return [_row_to_note(row) for row in rows]
+
+    @timed()
+    def search(self, query: str) -> List[Note]:
+        """Ищет заметки по словам заголовка, содержания и тегам.
+
+        Args:
+            query (str): Поисковый запрос; слова с «#» ищутся среди тегов,
+                последнее слово — по префиксу
+
+        Returns:
+            List[Note]: Найденные заметки в порядке возрастания ID
+        """
+        if not query.strip(' #'):
+            return []
+        return self.query(text=query)
+
+    def iter_search(self, query: str) -> Iterator[Note]:
+        """Последовательно возвращает найденные заметки.
+
+        Args:
+            query (str): Поисковый запрос, как в search()
+
+        Yields:
+            Note: Найденные заметки
+        """
+        yield from self.search(query)
+
+    @property
+    def generation(self) -> int:
+        """Номер версии заметок; растет при каждом изменении.
+
+        Изменения из других соединений определяются по PRAGMA data_version.
+        """
+        with self._lock:
+            try:
+                version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            except sqlite3.Error:
+                return self._generation
+            if version != self._data_version:
+                if self._data_version is not None:
+                    self._generation += 1
+                self._data_version = version
+            return self._generation
+
+    def flush(self) -> bool:
+        """Совместимость с Storage: изменения записываются в базу сразу.
+
+        Returns:
+            bool: Всегда True
+        """
+        return True
+
+    def invalidate(self):
+        """Совместимость с Storage: база не держит кэш заметок."""
+        self._generation += 1
+
+    def close(self):
+        """Закрывает соединение с базой."""
+        with self._lock:
+            self._conn.close()
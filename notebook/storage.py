@@ -2,14 +2,230 @@
 Модуль storage - работа с хранилищем заметок.
 
 Обеспечивает сохранение и загрузку заметок в формате JSON.
+Разобранные заметки кэшируются в памяти и перечитываются с диска
+только при изменении файла (mtime, размер или inode). Следующий
+свободный ID хранится в отдельном файле notes.ids.json, поэтому ID
+удаленных заметок не назначаются повторно. По желанию рядом пишется
+двоичный снимок notes.bin, который загружается при запуске вместо JSON,
+пока notes.json не изменился (см. binary_snapshot).
+
+Файл заметок перезаписывается атомарно: временный файл, fsync
+и os.replace, поэтому сбой во время записи не оставляет его
+недописанным. В режиме отложенной записи (write_delay) изменения сразу
+видны в памяти, а на диск все изменения за окно задержки попадают
+одной записью.
+
+Несколько процессов могут работать с одним файлом: запись выполняется
+под блокировкой notes.lock (см. filelock), и каждая запись увеличивает
+номер версии данных в notes.version. Если под блокировкой оказывается,
+что номер версии или отпечаток файла изменились после чтения, кэш
+обновляется и изменения применяются к свежей версии. Отпечатка
+(mtime, размер, inode) для этого недостаточно: при атомарной замене
+inode чередуются, и две записи одного размера в пределах одного тика
+mtime дают одинаковый отпечаток.
+При перечитывании измененного другим процессом файла индексы
+обновляются только для изменившихся заметок.
 """
 
 import json
 import os
-from typing import List, Dict
-from .models import Note
+import re
+import threading
+from contextlib import contextmanager
+from datetime import datetime
+from itertools import islice
+from typing import List, Dict, Iterable, Iterator, Optional, Tuple, Union
+from .models import Note, PRIORITIES, STATUSES
+from .search_index import SearchIndex, parse_query, compile_terms
+from .query import NoteIndexes
+from .filelock import FileLock
+from . import binary_snapshot
+from .profiling import PROFILER, measure, timed
 
 NOTES_FILE = "notes.json"
+# База данных SqliteStorage по умолчанию
+DB_FILE = "notes.db"
+# Доля изменившихся заметок, начиная с которой индексы после
+# перечитывания файла строятся заново, а не обновляются
+DELTA_REBUILD_RATIO = 0.25
+# Размер блока при потоковом чтении JSON
+CHUNK_SIZE = 64 * 1024
+
+_WHITESPACE = re.compile(r"[ \t\n\r]*")
+
+
+def iter_json_array(f, chunk_size: int = CHUNK_SIZE) -> Iterator:
+    """Последовательно разбирает элементы JSON-массива верхнего уровня.
+
+    Файл читается блоками, в памяти одновременно находятся только
+    текущий блок и разбираемый элемент.
+
+    Args:
+        f: Текстовый файл, открытый на чтение
+        chunk_size (int, optional): Размер блока. Defaults to CHUNK_SIZE.
+
+    Yields:
+        Элементы массива по одному
+
+    Raises:
+        json.JSONDecodeError: Если содержимое не является JSON-массивом
+    """
+    decoder = json.JSONDecoder()
+    buf, pos, eof = "", 0, False
+
+    def skip_ws():
+        nonlocal buf, pos, eof
+        while True:
+            pos = _WHITESPACE.match(buf, pos).end()
+            if pos < len(buf) or eof:
+                return
+            chunk = f.read(chunk_size)
+            eof = not chunk
+            buf, pos = buf[pos:] + chunk, 0
+
+    def read_more():
+        # Дочитывается не меньше, чем уже есть в буфере: буфер растет
+        # геометрически, и разбор большого элемента остается линейным
+        nonlocal buf, pos, eof
+        chunk = f.read(max(chunk_size, len(buf) - pos))
+        eof = not chunk
+        buf, pos = buf[pos:] + chunk, 0
+
+    skip_ws()
+    if buf[pos:pos + 1] != "[":
+        raise json.JSONDecodeError("Ожидался JSON-массив", buf, pos)
+    pos += 1
+    skip_ws()
+    if buf[pos:pos + 1] == "]":
+        return
+    while True:
+        try:
+            item, end = decoder.raw_decode(buf, pos)
+        except json.JSONDecodeError:
+            if eof:
+                raise
+            # Элемент не поместился в буфер — дочитываем следующий блок
+            read_more()
+            continue
+        if (not eof and isinstance(item, (int, float)) and not isinstance(item, bool)
+                and (end == len(buf) or buf[end] in "0123456789.eE+-")):
+            # Число на границе блока могло быть прочитано не полностью
+            read_more()
+            continue
+        yield item
+        pos = end
+        skip_ws()
+        sep = buf[pos:pos + 1]
+        pos += 1
+        if sep == "]":
+            return
+        if sep != ",":
+            raise json.JSONDecodeError("Ожидалась запятая", buf, pos - 1)
+        skip_ws()
+
+
+def export_notes(notes: Iterable[Note], path: Union[str, os.PathLike]) -> int:
+    """Потоково записывает заметки в JSON-массив или JSON Lines (.jsonl).
+
+    Args:
+        notes (Iterable[Note]): Заметки для экспорта
+        path (Union[str, os.PathLike]): Путь к файлу экспорта
+
+    Returns:
+        int: Число записанных заметок
+    """
+    count = 0
+    jsonl = os.fspath(path).endswith(".jsonl")
+    with open(path, 'w', encoding='utf-8') as f:
+        if not jsonl:
+            f.write("[")
+        for note in notes:
+            text = json.dumps(note.to_dict(), ensure_ascii=False)
+            if jsonl:
+                f.write(text + "\n")
+            else:
+                f.write(("," if count else "") + "\n  " + text)
+            count += 1
+        if not jsonl:
+            f.write("\n]\n" if count else "]\n")
+    return count
+
+
+def _note_from_item(item) -> Optional[Note]:
+    """Создает новую заметку из импортируемого элемента.
+
+    Args:
+        item (Union[dict, Note]): Словарь в формате to_dict() или объект Note
+
+    Returns:
+        Optional[Note]: Заметка без ID или None, если элемент некорректен
+    """
+    try:
+        data = item.to_dict() if isinstance(item, Note) else dict(item)
+        tags = data.get("tags")
+        if tags is not None and not (isinstance(tags, list) and all(isinstance(t, str) for t in tags)):
+            return None
+        if "created_at" in data:
+            # Дата создания должна быть строкой ISO (TypeError для null)
+            datetime.fromisoformat(data["created_at"])
+        note = Note(title=data["title"], content=data["content"],
+                    priority=data.get("priority", "medium"),
+                    status=data.get("status", "active"),
+                    tags=tags)
+    except (KeyError, TypeError, ValueError, AttributeError):
+        return None
+    if note.priority not in PRIORITIES or note.status not in STATUSES:
+        return None
+    if "created_at" in data:
+        note.created_at = data["created_at"]
+    return note
+
+
+def _same_note(a: Note, b: Note) -> bool:
+    """Сравнивает две версии заметки с одним ID.
+
+    Заметки с незагруженным содержанием считаются различными, чтобы
+    не читать содержание с диска ради сравнения.
+
+    Args:
+        a (Note): Прежняя версия
+        b (Note): Новая версия
+
+    Returns:
+        bool: True, если версии совпадают
+    """
+    if not (a.content_loaded and b.content_loaded):
+        return False
+    return (a.title == b.title and a.content == b.content and a.priority == b.priority
+            and a.status == b.status and a.tags == b.tags and a._created == b._created)
+
+
+def iter_import(source: Union[str, os.PathLike, Iterable]) -> Iterator[Optional[Note]]:
+    """Последовательно читает импортируемые заметки.
+
+    Args:
+        source (Union[str, os.PathLike, Iterable]): Путь к JSON-массиву или
+            файлу JSON Lines (.jsonl), либо итерируемый набор словарей или Note
+
+    Yields:
+        Optional[Note]: Новая заметка без ID или None для некорректного элемента
+    """
+    if not isinstance(source, (str, os.PathLike)):
+        for item in source:
+            yield _note_from_item(item)
+        return
+    with open(source, 'r', encoding='utf-8') as f:
+        if os.fspath(source).endswith(".jsonl"):
+            for line in f:
+                if not line.strip():
+                    continue
+                try:
+                    yield _note_from_item(json.loads(line))
+                except json.JSONDecodeError:
+                    yield None
+        else:
+            for item in iter_json_array(f):
+                yield _note_from_item(item)
 
 
 class Storage:
@@ -17,36 +233,418 @@ class Storage:
 
     Attributes:
         file_path (str): Путь к файлу с заметками
+        index_path (str): Путь к сохраненному поисковому индексу
+        counter_path (str): Путь к файлу со следующим свободным ID
+        binary_path (str): Путь к двоичному снимку заметок
+        persist_index (bool): Сохранять ли поисковый индекс на диск
+        binary_snapshot (bool): Использовать ли двоичный снимок
+        write_delay (float): Задержка отложенной записи в секундах (0 — сразу)
     """
 
-    def __init__(self, file_path: str = NOTES_FILE):
+    def __init__(self, file_path: str = NOTES_FILE, persist_index: bool = False,
+                 binary_snapshot: bool = False, write_delay: float = 0.0):
         """Инициализирует хранилище.
 
         Args:
             file_path (str, optional): Путь к файлу заметок. Defaults to NOTES_FILE.
+            persist_index (bool, optional): Сохранять поисковый индекс рядом
+                с файлом заметок. Defaults to False.
+            binary_snapshot (bool, optional): Загружать заметки из двоичного
+                снимка, если он соответствует файлу, и обновлять его при
+                закрытии. Defaults to False.
+            write_delay (float, optional): Откладывать запись на указанное
+                число секунд, объединяя все изменения за это время в одну
+                запись; flush() и close() записывают сразу. Действует только
+                для хранилища json — в подклассах запись и так дописывающая.
+                Defaults to 0.0.
         """
         self.file_path = file_path
+        self.index_path = os.path.splitext(file_path)[0] + ".index.json"
+        self.counter_path = os.path.splitext(file_path)[0] + ".ids.json"
+        self.binary_path = os.path.splitext(file_path)[0] + ".bin"
+        self.lock_path = os.path.splitext(file_path)[0] + ".lock"
+        self.version_path = os.path.splitext(file_path)[0] + ".version"
+        self.persist_index = persist_index
+        self.binary_snapshot = binary_snapshot
+        # Отпечаток файла заметок, которому соответствует двоичный снимок
+        self._binary_stamp: Optional[Tuple[int, int, int]] = None
+        # Кэш разобранных заметок по ID (в порядке следования в файле)
+        self._notes: Optional[Dict[int, Note]] = None
+        # Отпечаток файла (mtime, размер, inode), которому соответствует кэш
+        self._stamp: Optional[Tuple[int, int, int]] = None
+        # Номер версии данных, которому соответствует кэш (см. version_path),
+        # и признак того, что под блокировкой обнаружена более новая версия
+        self._version: Optional[int] = None
+        self._stale = False
+        # Поисковый и вторичные индексы строятся при первом обращении
+        self._search_index: Optional[SearchIndex] = None
+        self._query_indexes: Optional[NoteIndexes] = None
+        # Следующий свободный ID и значение, записанное в counter_path
+        self._next_id = 1
+        self._saved_next_id = 0
+        # Номер версии заметок для кэшей результатов (см. generation)
+        self._generation = 0
+        self.write_delay = write_delay
+        # Есть ли изменения, еще не записанные на диск, и таймер их записи;
+        # блокировка разделяет изменения кэша и запись из потока таймера;
+        # под ней же выполняются чтения: flush() может перечитать файл,
+        # измененный другим процессом, и обновить кэш и индексы
+        self._dirty = False
+        self._flush_timer: Optional[threading.Timer] = None
+        self._write_lock = threading.RLock()
+        # Отложенные изменения — для переноса на свежую версию файла,
+        # если его изменил другой процесс, — и ID созданных заметок
+        self._pending_puts: Dict[int, Note] = {}
+        self._pending_deletes: set = set()
+        self._pending_new: set = set()
+        self._file_lock = FileLock(self.lock_path)
 
-    def _load_notes(self) -> List[Dict]:
-        """Читает заметки из файла.
+    def _file_stamp(self) -> Optional[Tuple[int, int, int]]:
+        """Возвращает отпечаток файла заметок.
 
         Returns:
-            List[Dict]: Список заметок в виде словарей
+            Optional[Tuple[int, int, int]]: (mtime в нс, размер, inode)
+                или None, если файл не существует
+        """
+        try:
+            st = os.stat(self.file_path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size, st.st_ino
+
+    def _get_cache(self) -> Dict[int, Note]:
+        """Возвращает кэш заметок, перечитывая файл только при его изменении.
+
+        Returns:
+            Dict[int, Note]: Заметки по ID
+        """
+        with self._write_lock:
+            stamp = self._file_stamp()
+            # Пока есть незаписанные изменения, кэш новее файла
+            if self._notes is None or ((stamp != self._stamp or self._stale) and not self._dirty):
+                # Номер версии читается до данных: он может оказаться только
+                # старше прочитанных данных, и тогда запись лишний раз перечитает файл
+                version = self._read_version()
+                notes = self._load_binary(stamp)
+                if notes is None:
+                    items = self._iter_items()
+                    if PROFILER.enabled:
+                        # Разбор файла и создание объектов замеряются по отдельности
+                        with measure("Storage._load_notes"):
+                            items = list(items)
+                    notes = {}
+                    with measure("Storage._make_notes"):
+                        for item in items:
+                            note = self._make_note(item)
+                            notes[note.id] = note
+                previous = self._notes
+                if previous is not None:
+                    notes = self._apply_delta(previous, notes)
+                self._notes = notes
+                self._stamp = stamp
+                self._version = version
+                self._stale = False
+                self._saved_next_id = self._read_counter()
+                self._next_id = max(self._saved_next_id, max(notes, default=0) + 1)
+                if previous is None:
+                    self._on_reload()
+            return self._notes
+
+    def _apply_delta(self, previous: Dict[int, Note], notes: Dict[int, Note]) -> Dict[int, Note]:
+        """Переносит на перечитанные заметки индексы и объекты прежнего кэша.
+
+        Неизменившиеся заметки сохраняют прежние объекты, а индексы
+        обновляются только для добавленных, измененных и удаленных
+        заметок. Если изменилась большая часть заметок, индексы
+        сбрасываются и строятся заново при обращении.
+
+        Args:
+            previous (Dict[int, Note]): Прежний кэш
+            notes (Dict[int, Note]): Заметки, прочитанные из файла
+
+        Returns:
+            Dict[int, Note]: Новый кэш
+        """
+        merged = {}
+        changed = []
+        for note_id, note in notes.items():
+            old = previous.get(note_id)
+            if old is not None and _same_note(old, note):
+                merged[note_id] = old
+            else:
+                merged[note_id] = note
+                changed.append(note)
+        removed = [note_id for note_id in previous if note_id not in notes]
+        if len(changed) + len(removed) > DELTA_REBUILD_RATIO * max(len(notes), 1):
+            self._on_reload()
+            return merged
+        for index in (self._search_index, self._query_indexes):
+            if index is None:
+                continue
+            for note_id in removed:
+                index.remove(note_id)
+            for note in changed:
+                index.add(note)
+        if changed or removed:
+            self._generation += 1
+        return merged
+
+    @timed()
+    def _load_binary(self, stamp) -> Optional[Dict[int, Note]]:
+        """Загружает заметки из двоичного снимка, если он соответствует файлу.
+
+        Args:
+            stamp: Текущий отпечаток файла заметок
+
+        Returns:
+            Optional[Dict[int, Note]]: Заметки по ID или None, если снимок
+                отключен, отсутствует или устарел
+        """
+        if not self.binary_snapshot or stamp is None:
+            return None
+        notes = binary_snapshot.load(self.binary_path, stamp)
+        if notes is not None:
+            self._binary_stamp = stamp
+        return notes
+
+    def _make_note(self, item: Dict) -> Note:
+        """Создает объект Note из прочитанной записи.
+
+        Args:
+            item (Dict): Запись, возвращенная _load_notes()
+
+        Returns:
+            Note: Объект заметки
+        """
+        return Note.from_dict(item)
+
+    def _on_reload(self):
+        """Сбрасывает индексы после перечитывания файла."""
+        self._search_index = None
+        self._query_indexes = None
+        self._generation += 1
+
+    @property
+    def generation(self) -> int:
+        """Номер версии заметок; растет при каждом изменении.
+
+        Учитываются и изменения файла другими программами: если отпечаток
+        файла не совпадает с кэшем, кэш перечитывается. Результаты,
+        запомненные при одном номере, при другом номере недействительны.
+        """
+        with self._write_lock:
+            if self._notes is not None and self._file_stamp() != self._stamp:
+                self._get_cache()
+            return self._generation
+
+    def _cache_put(self, note: Note):
+        """Помещает сохраненную заметку в кэш и индексы.
+
+        Args:
+            note (Note): Заметка с назначенным ID
+        """
+        self._notes.pop(note.id, None)
+        self._notes[note.id] = note
+        if self._search_index is not None:
+            self._search_index.add(note)
+        if self._query_indexes is not None:
+            self._query_indexes.add(note)
+
+    def _cache_remove(self, note_id: int):
+        """Убирает удаленную заметку из кэша и индексов.
+
+        Args:
+            note_id (int): ID заметки
+        """
+        del self._notes[note_id]
+        if self._search_index is not None:
+            self._search_index.remove(note_id)
+        if self._query_indexes is not None:
+            self._query_indexes.remove(note_id)
+
+    def _read_counter(self) -> int:
+        """Читает сохраненный следующий свободный ID.
+
+        Returns:
+            int: Следующий ID или 0, если файл счетчика не существует
+        """
+        try:
+            with open(self.counter_path, 'r', encoding='utf-8') as f:
+                return int(json.load(f)["next_id"])
+        except FileNotFoundError:
+            return 0
+        except (json.JSONDecodeError, PermissionError, OSError, KeyError, TypeError, ValueError) as e:
+            print(f"Ошибка при чтении счетчика ID: {e}")
+            return 0
+
+    def _write_counter(self) -> bool:
+        """Атомарно сохраняет следующий свободный ID.
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        tmp_path = self.counter_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump({"next_id": self._next_id}, f)
+            os.replace(tmp_path, self.counter_path)
+        except (PermissionError, OSError) as e:
+            print(f"Ошибка при записи счетчика ID: {e}")
+            return False
+        self._saved_next_id = self._next_id
+        return True
+
+    def _keep_counter(self, deleted: List[int]) -> bool:
+        """Сохраняет счетчик ID перед удалением заметок, если нужно.
+
+        Пока в файле заметок остается заметка с наибольшим ID, счетчик
+        восстанавливается по ней; сохранять его нужно, только если
+        удаляется одна из заметок с ID не меньше сохраненного значения.
+
+        Args:
+            deleted (List[int]): ID удаляемых заметок
+
+        Returns:
+            bool: True если счетчик актуален, иначе False
+        """
+        if max(deleted) < self._saved_next_id:
+            return True
+        return self._write_counter()
+
+    def _read_version(self) -> Optional[int]:
+        """Читает номер версии данных.
+
+        Returns:
+            Optional[int]: Номер версии, 0 если файл версии не существует,
+                или None, если его не удалось прочитать
+        """
+        try:
+            with open(self.version_path, 'r', encoding='utf-8') as f:
+                return int(f.read())
+        except FileNotFoundError:
+            return 0
+        except (PermissionError, OSError, ValueError):
+            return None
+
+    def _bump_version(self):
+        """Увеличивает номер версии после записи (под блокировкой файла)."""
+        version = (self._version or 0) + 1
+        tmp_path = self.version_path + ".tmp"
+        try:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                f.write(str(version))
+            os.replace(tmp_path, self.version_path)
+        except (PermissionError, OSError) as e:
+            # Данные уже записаны; другие процессы заметят их по отпечатку файла
+            print(f"Ошибка при записи версии хранилища: {e}")
+            return
+        self._version = version
+
+    @contextmanager
+    def _writing(self, immediate: bool = True):
+        """Блокирует хранилище на время изменения.
+
+        Изменение исключает другие потоки процесса, а если оно сразу
+        пишется на диск — и другие процессы (блокировка файла lock_path).
+        Если после получения блокировки номер версии данных не совпадает
+        с кэшем, кэш помечается устаревшим и перечитывается.
+
+        Args:
+            immediate (bool, optional): Пишется ли изменение на диск сразу.
+                Defaults to True.
+
+        Yields:
+            bool: True, если блокировка получена
+        """
+        with self._write_lock:
+            if not immediate:
+                yield True
+                return
+            try:
+                self._file_lock.acquire()
+            except OSError as e:
+                print(f"Ошибка блокировки хранилища: {e}")
+                yield False
+                return
+            try:
+                version = self._read_version()
+                if version is None or version != self._version:
+                    self._stale = True
+                yield True
+            finally:
+                self._file_lock.release()
+
+    def invalidate(self):
+        """Сбрасывает кэш — следующее чтение заново разберет файл.
+
+        Незаписанные изменения предварительно записываются.
+        """
+        self.flush()
+        self._notes = None
+        self._stamp = None
+        self._on_reload()
+
+    def _get_search_index(self) -> SearchIndex:
+        """Возвращает поисковый индекс, загружая или строя его при необходимости.
+
+        Returns:
+            SearchIndex: Индекс, соответствующий текущему кэшу
+        """
+        with self._write_lock:
+            notes = self._get_cache()
+            if self._search_index is None:
+                if self.persist_index:
+                    self._search_index = SearchIndex.load(self.index_path, self._stamp)
+                if self._search_index is None:
+                    self._search_index = SearchIndex.build(notes.values())
+                    if self.persist_index:
+                        self._search_index.dump(self.index_path, self._stamp)
+            return self._search_index
+
+    def _read_items(self) -> Iterator[Dict]:
+        """Потоково читает заметки из файла, не загружая его целиком.
+
+        Yields:
+            Dict: Заметки в виде словарей
 
         Note:
-            Возвращает пустой список, если файл не существует
+            Ничего не возвращает, если файл не существует
         """
         if not os.path.exists(self.file_path):
-            return []
+            return
         try:
             with open(self.file_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+                yield from iter_json_array(f)
+                if PROFILER.enabled:
+                    PROFILER.add_bytes("Storage._load_notes", os.fstat(f.fileno()).st_size)
         except (json.JSONDecodeError, PermissionError) as e:
             print(f"Ошибка при чтении файла: {e}")
-            return []
 
+    def _iter_items(self) -> Iterator[Dict]:
+        """Последовательно возвращает записи хранилища для построения заметок.
+
+        Yields:
+            Dict: Записи, из которых _make_note() создает заметки
+        """
+        return self._read_items()
+
+    def _load_notes(self) -> List[Dict]:
+        """Читает заметки из файла.
+
+        Returns:
+            List[Dict]: Список заметок в виде словарей
+
+        Note:
+            Возвращает пустой список, если файл не существует
+        """
+        return list(self._read_items())
+
+    @timed()
     def _save_notes(self, notes: List[Dict]) -> bool:
-        """Сохраняет заметки в файл.
+        """Атомарно сохраняет заметки в файл.
+
+        Заметки пишутся во временный файл, который после fsync заменяет
+        файл заметок через os.replace: при сбое остается прежняя версия.
 
         Args:
             notes (List[Dict]): Список заметок для сохранения
@@ -54,27 +652,168 @@ class Storage:
         Returns:
             bool: True если сохранение успешно, иначе False
         """
+        tmp_path = self.file_path + ".tmp"
         try:
-            with open(self.file_path, 'w', encoding='utf-8') as f:
+            with open(tmp_path, 'w', encoding='utf-8') as f:
                 json.dump(notes, f, ensure_ascii=False, indent=2)
+                if PROFILER.enabled:
+                    PROFILER.add_bytes("Storage._save_notes", f.tell())
+                f.flush()
+                os.fsync(f.fileno())
+            os.replace(tmp_path, self.file_path)
             return True
         except (PermissionError, OSError) as e:
             print(f"Ошибка при записи в файл: {e}")
             return False
 
+    @timed()
     def get_all(self) -> List[Note]:
         """Возвращает все заметки как объекты Note.
 
         Returns:
             List[Note]: Список объектов Note
+
+        Note:
+            Объекты берутся из кэша и разделяются между вызовами;
+            изменения следует сохранять через save()
         """
-        data = self._load_notes()
-        notes = []
-        for item in data:
-            note = Note.from_dict(item)
-            notes.append(note)
-        return notes
+        with self._write_lock:
+            return list(self._get_cache().values())
+
+    def _cache_is_fresh(self) -> bool:
+        """Проверяет, что кэш заметок соответствует файлу на диске."""
+        return self._notes is not None and (self._dirty or self._file_stamp() == self._stamp)
+
+    @timed()
+    def get(self, note_id: int) -> Optional[Note]:
+        """Возвращает заметку по ID.
+
+        Если кэш актуален, заметка берется из него по ключу; иначе файл
+        читается потоково до найденной записи, и объект создается только
+        для нее.
+
+        Args:
+            note_id (int): ID заметки
+
+        Returns:
+            Optional[Note]: Заметка или None, если не найдена
+        """
+        with self._write_lock:
+            if self._cache_is_fresh():
+                return self._notes.get(note_id)
+        for item in self._iter_items():
+            if item.get("id") == note_id:
+                return self._make_note(item)
+        return None
+
+    def iter_notes(self) -> Iterator[Note]:
+        """Последовательно возвращает заметки, не собирая их в список.
+
+        Если кэш актуален, заметки берутся из него; иначе файл
+        разбирается потоково, и первые заметки доступны до окончания
+        чтения. Память при потоковом чтении не зависит от размера файла.
+
+        Yields:
+            Note: Заметки в порядке хранения
+        """
+        with self._write_lock:
+            notes = list(self._notes.values()) if self._cache_is_fresh() else None
+        if notes is not None:
+            yield from notes
+            return
+        for item in self._iter_items():
+            yield self._make_note(item)
+
+    def count(self) -> int:
+        """Возвращает число заметок.
+
+        Returns:
+            int: Число заметок в хранилище
+        """
+        with self._write_lock:
+            if self._cache_is_fresh():
+                return len(self._notes)
+        return sum(1 for _ in self._iter_items())
+
+    def export(self, path: Union[str, os.PathLike]) -> int:
+        """Потоково выгружает заметки в JSON-массив или JSON Lines (.jsonl).
+
+        Args:
+            path (Union[str, os.PathLike]): Путь к файлу экспорта
+
+        Returns:
+            int: Число выгруженных заметок
+        """
+        return export_notes(self.iter_notes(), path)
+
+    def iter_search(self, query: str) -> Iterator[Note]:
+        """Последовательно возвращает найденные заметки.
+
+        Если поисковый индекс уже построен, используется он; иначе
+        заметки проверяются по мере потокового чтения файла.
+
+        Args:
+            query (str): Поисковый запрос, как в search()
+
+        Yields:
+            Note: Найденные заметки
+        """
+        if self._search_index is not None and self._cache_is_fresh():
+            yield from self.search(query)
+            return
+        matches = compile_terms(parse_query(query))
+        for note in self.iter_notes():
+            if matches(note):
+                yield note
+
+    def _write_batch(self, puts: List[Note], deletes: List[int]) -> bool:
+        """Записывает пакет изменений на диск одной перезаписью файла.
+
+        Args:
+            puts (List[Note]): Добавленные и обновленные заметки с ID
+            deletes (List[int]): ID удаляемых заметок
+
+        Returns:
+            bool: True если запись успешна, иначе False
+        """
+        if self.write_delay > 0:
+            # Кэш обновится вызывающим методом, файл запишет flush()
+            for note_id in deletes:
+                self._pending_puts.pop(note_id, None)
+                self._pending_deletes.add(note_id)
+            for note in puts:
+                self._pending_puts.pop(note.id, None)
+                self._pending_puts[note.id] = note
+                self._pending_deletes.discard(note.id)
+            self._dirty = True
+            if self._flush_timer is None:
+                # Поток таймера не фоновый: при выходе из программы
+                # интерпретатор дождется записи
+                self._flush_timer = threading.Timer(self.write_delay, self.flush)
+                self._flush_timer.start()
+            return True
+        changed = {n.id for n in puts}.union(deletes)
+        # Обновленные заметки переносятся в конец, как и новые
+        data = [n.to_dict() for n in self._notes.values() if n.id not in changed]
+        data.extend(n.to_dict() for n in puts)
+        return self._save_notes(data)
+
+    def _assign_ids(self, notes: List[Note]):
+        """Назначает ID новым заметкам из счетчика без просмотра хранилища.
 
+        Args:
+            notes (List[Note]): Заметки; ID получают те, у кого он None
+        """
+        next_id = self._next_id
+        for note in notes:
+            if note.id is None:
+                note.id = next_id
+                next_id += 1
+            elif note.id >= next_id:
+                next_id = note.id + 1
+        self._next_id = next_id
+
+    @timed()
     def save(self, note: Note) -> bool:
         """Сохраняет одну заметку (добавляет или обновляет).
 
@@ -84,17 +823,48 @@ class Storage:
         Returns:
             bool: True если сохранение успешно, иначе False
         """
-        notes = self.get_all()
-        if note.id is None:
-            # Новая заметка — назначаем ID
-            note.id = max([n.id for n in notes] + [0]) + 1
-            notes.append(note)
-        else:
-            # Обновляем существующую
-            notes = [n for n in notes if n.id != note.id]
-            notes.append(note)
-        return self._save_notes([n.to_dict() for n in notes])
+        return self.save_many([note])[0]
 
+    @timed()
+    def save_many(self, notes: Iterable[Note]) -> List[bool]:
+        """Сохраняет пакет заметок одной записью на диск.
+
+        Args:
+            notes (Iterable[Note]): Заметки для добавления или обновления
+
+        Returns:
+            List[bool]: Результат для каждой заметки в порядке передачи
+        """
+        notes = list(notes)
+        if not notes:
+            return []
+        with self._writing(self.write_delay <= 0) as locked:
+            if not locked:
+                return [False] * len(notes)
+            # Под блокировкой кэш сверяется с файлом: если другой процесс
+            # успел его изменить, пакет применяется к свежей версии
+            self._get_cache()
+            new = [note for note in notes if note.id is None]
+            self._assign_ids(notes)
+            # При повторе ID в пакете сохраняется последняя версия
+            puts = list({note.id: note for note in notes}.values())
+            if not self._write_batch(puts, []):
+                for note in new:
+                    note.id = None
+                return [False] * len(notes)
+            if self._dirty:
+                self._pending_new.update(note.id for note in new)
+            for note in puts:
+                self._cache_put(note)
+            if not self._dirty:
+                # При отложенной записи файл еще не записан: его отпечаток
+                # мог измениться другим процессом, и flush() должен это увидеть
+                self._stamp = self._file_stamp()
+                self._bump_version()
+            self._generation += 1
+        return [True] * len(notes)
+
+    @timed()
     def delete(self, note_id: int) -> bool:
         """Удаляет заметку по ID.
 
@@ -104,8 +874,199 @@ class Storage:
         Returns:
             bool: True если удаление успешно, иначе False
         """
-        notes = self.get_all()
-        filtered = [n for n in notes if n.id != note_id]
-        if len(filtered) == len(notes):
-            return False  # Не найдено
-        return self._save_notes([n.to_dict() for n in filtered])
\ No newline at end of file
+        return self.delete_many([note_id])[0]
+
+    @timed()
+    def delete_many(self, note_ids: Iterable[int]) -> List[bool]:
+        """Удаляет пакет заметок одной записью на диск.
+
+        Args:
+            note_ids (Iterable[int]): ID заметок для удаления
+
+        Returns:
+            List[bool]: Для каждого ID — True, если заметка удалена;
+                False, если она не найдена или запись не удалась
+        """
+        note_ids = list(note_ids)
+        with self._writing(self.write_delay <= 0) as locked:
+            if not locked:
+                return [False] * len(note_ids)
+            notes = self._get_cache()
+            found = list(dict.fromkeys(i for i in note_ids if i in notes))
+            if not found:
+                return [False] * len(note_ids)  # Не найдено
+            if not self._keep_counter(found) or not self._write_batch([], found):
+                return [False] * len(note_ids)
+            for note_id in found:
+                self._cache_remove(note_id)
+            if not self._dirty:
+                self._stamp = self._file_stamp()
+                self._bump_version()
+            self._generation += 1
+        found = set(found)
+        return [i in found for i in note_ids]
+
+    def import_from(self, source: Union[str, os.PathLike, Iterable]) -> List[Optional[int]]:
+        """Импортирует заметки как новые одной записью на диск.
+
+        Args:
+            source (Union[str, os.PathLike, Iterable]): Путь к JSON-массиву
+                или файлу JSON Lines (.jsonl), либо итерируемый набор
+                словарей или объектов Note
+
+        Returns:
+            List[Optional[int]]: Назначенный ID для каждого элемента
+                или None, если элемент некорректен или запись не удалась
+        """
+        notes = list(iter_import(source))
+        valid = [note for note in notes if note is not None]
+        saved = dict(zip(map(id, valid), self.save_many(valid)))
+        return [note.id if note is not None and saved[id(note)] else None for note in notes]
+
+    @timed()
+    def search(self, query: str) -> List[Note]:
+        """Ищет заметки по словам заголовка, содержания и тегам.
+
+        Args:
+            query (str): Поисковый запрос; слова с «#» ищутся среди тегов,
+                последнее слово — по префиксу
+
+        Returns:
+            List[Note]: Найденные заметки в порядке возрастания ID
+        """
+        with self._write_lock:
+            ids = self._get_search_index().search(query)
+            return [self._notes[note_id] for note_id in sorted(ids)]
+
+    def _get_query_indexes(self) -> NoteIndexes:
+        """Возвращает вторичные индексы, строя их при необходимости.
+
+        Returns:
+            NoteIndexes: Индексы, соответствующие текущему кэшу
+        """
+        with self._write_lock:
+            notes = self._get_cache()
+            if self._query_indexes is None:
+                self._query_indexes = NoteIndexes.build(notes.values())
+            return self._query_indexes
+
+    @timed()
+    def query(self, tags=None, priority=None, status=None,
+              created_between=None, text: Optional[str] = None) -> List[Note]:
+        """Выбирает заметки по условиям на поля, используя индексы.
+
+        Пример: storage.query(tags="работа", priority="high", status="active",
+        created_between=(datetime.now() - timedelta(days=7), None))
+
+        Args:
+            tags (Union[str, Iterable[str]], optional): Теги, все обязательны
+            priority (Union[str, Iterable[str]], optional): Допустимые приоритеты
+            status (Union[str, Iterable[str]], optional): Допустимые статусы
+            created_between (Tuple, optional): Диапазон дат создания [start, end),
+                границы — datetime, строка ISO или None
+            text (str, optional): Поисковый запрос, как в search()
+
+        Returns:
+            List[Note]: Подходящие заметки в порядке возрастания ID
+        """
+        with self._write_lock:
+            ids = self._get_query_indexes().plan(tags, priority, status, created_between)
+            if text is not None and text.strip(' #'):
+                found = self._get_search_index().search(text)
+                ids = found if ids is None else ids & found
+            if ids is None:
+                ids = self._notes.keys()
+            return [self._notes[note_id] for note_id in sorted(ids)]
+
+    @timed()
+    def order_by(self, field: str = "created", descending: bool = False,
+                 limit: Optional[int] = None) -> List[Note]:
+        """Возвращает заметки, упорядоченные по полю.
+
+        Порядок строится один раз и затем поддерживается при сохранении
+        и удалении, поэтому смена сортировки не сортирует заметки заново,
+        а первые N заметок выбираются без просмотра остальных.
+
+        Пример: storage.order_by("priority", descending=True, limit=10) —
+        десять заметок с наивысшим приоритетом, сначала новые.
+
+        Args:
+            field (str, optional): Поле из SORT_FIELDS (id, title, priority,
+                status, created). Defaults to "created".
+            descending (bool, optional): По убыванию. Defaults to False.
+            limit (int, optional): Не больше указанного числа заметок
+
+        Returns:
+            List[Note]: Заметки в заданном порядке
+        """
+        with self._write_lock:
+            notes = self._get_cache()
+            keys = self._get_query_indexes().order(field, notes.values())
+            keys = reversed(keys) if descending else iter(keys)
+            if limit is not None:
+                keys = islice(keys, limit)
+            return [notes[key[-1]] for key in keys]
+
+    def flush(self) -> bool:
+        """Записывает отложенные изменения одной атомарной записью.
+
+        Если другой процесс изменил файл после последнего чтения,
+        отложенные изменения переносятся на свежую версию файла.
+
+        Returns:
+            bool: True если незаписанных изменений не осталось, иначе False
+        """
+        with self._write_lock:
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            if not self._dirty:
+                return True
+            with self._writing() as locked:
+                if not locked:
+                    return False
+                if self._stale or self._file_stamp() != self._stamp:
+                    self._rebase_pending()
+                if not self._save_notes([n.to_dict() for n in self._notes.values()]):
+                    return False
+                self._stamp = self._file_stamp()
+                self._bump_version()
+            self._dirty = False
+            self._pending_puts, self._pending_deletes, self._pending_new = {}, set(), set()
+            return True
+
+    def _rebase_pending(self):
+        """Перечитывает измененный другим процессом файл и повторяет поверх
+        него отложенные изменения.
+
+        Созданные заметки, ID которых мог занять другой процесс,
+        получают новые ID.
+        """
+        puts, deletes = list(self._pending_puts.values()), self._pending_deletes
+        self._dirty = False
+        notes = self._get_cache()
+        new = [note for note in puts if note.id in self._pending_new]
+        for note in new:
+            if note.id in notes or note.id < self._next_id:
+                note.id = None
+        self._assign_ids(puts)
+        self._pending_puts = {note.id: note for note in puts}
+        self._pending_new = {note.id for note in new}
+        for note_id in deletes:
+            if note_id in notes:
+                self._cache_remove(note_id)
+        for note in self._pending_puts.values():
+            self._cache_put(note)
+        self._dirty = True
+        self._generation += 1
+
+    def close(self):
+        """Записывает отложенные изменения и сохраняет индекс и снимок, если они включены."""
+        if not self.flush():
+            return
+        if self.persist_index and self._search_index is not None:
+            self._search_index.dump(self.index_path, self._stamp)
+        if (self.binary_snapshot and self._notes is not None and self._stamp is not None
+                and self._stamp != self._binary_stamp):
+            if binary_snapshot.dump(self._notes.values(), self.binary_path, self._stamp):
+                self._binary_stamp = self._stamp
@@ -0,0 +1,75 @@
+"""Тесты одновременной работы нескольких процессов с одним хранилищем."""
+
+import multiprocessing
+import pytest
+from notebook import Note, Storage, JournalStorage
+
+PROCESSES = 3
+SAVES = 60
+
+
+def _writer(path: str, tag: str, write_delay: float):
+    """Сохраняет SAVES заметок по одной."""
+    storage = Storage(path, write_delay=write_delay)
+    for i in range(SAVES):
+        storage.save(Note(title=f"{tag}-{i}", content="", tags=[tag]))
+    storage.close()
+
+
+def _journal_writer(path: str, tag: str):
+    """Сохраняет SAVES крупных заметок, часто запуская уплотнение журнала."""
+    storage = JournalStorage(path, compact_bytes=50000)
+    for i in range(SAVES):
+        storage.save(Note(title=f"{tag}-{i}", content="x" * 20000, tags=[tag]))
+    storage.close()
+
+
+def _run_writers(target, path: str, *args):
+    """Запускает PROCESSES процессов записи и дожидается их завершения."""
+    processes = [multiprocessing.Process(target=target, args=(path, f"p{k}") + args)
+                 for k in range(PROCESSES)]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+
+def _assert_all_saved(notes):
+    """Проверяет, что сохранены заметки всех процессов и ID не повторяются."""
+    assert len({note.id for note in notes}) == len(notes)
+    assert sorted(note.title for note in notes) == sorted(
+        f"p{k}-{i}" for k in range(PROCESSES) for i in range(SAVES))
+
+
+@pytest.mark.parametrize("write_delay", [0.0, 0.01])
+@pytest.mark.parametrize("run", range(3))
+def test_concurrent_writers_keep_all_notes(tmp_path, write_delay, run):
+    """Заметки всех процессов сохраняются, ID не повторяются."""
+    path = str(tmp_path / "notes.json")
+    _run_writers(_writer, path, write_delay)
+    _assert_all_saved(Storage(path).get_all())
+
+
+@pytest.mark.parametrize("run", range(5))
+def test_concurrent_journal_compaction_keeps_all_notes(tmp_path, run):
+    """Одновременные уплотнения журнала в разных процессах не теряют записей."""
+    path = str(tmp_path / "notes.json")
+    _run_writers(_journal_writer, path)
+    _assert_all_saved(JournalStorage(path).get_all())
+
+
+def test_version_detects_repeated_file_stamp(tmp_path):
+    """Запись другим процессом замечается, даже если отпечаток файла повторился."""
+    path = str(tmp_path / "notes.json")
+    first, second = Storage(path), Storage(path)
+    first.save(Note(title="первая", content=""))
+    # Одинаковый отпечаток: inode вернулся, а размер и mtime совпали
+    first._file_stamp = second._file_stamp = lambda: (0, 0, 0)
+    first.get_all()
+    second.get_all()
+    second.save(Note(title="вторая", content=""))
+    first.save(Note(title="третья", content=""))
+    notes = Storage(path).get_all()
+    assert sorted(note.title for note in notes) == ["вторая", "первая", "третья"]
+    assert len({note.id for note in notes}) == 3
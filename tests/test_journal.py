@@ -0,0 +1,19 @@
+"""Тесты журнального хранилища."""
+
+from notebook import Note, JournalStorage
+
+
+def test_append_after_torn_line(tmp_path):
+    """Запись после недописанной строки журнала не теряется при открытии."""
+    path = str(tmp_path / "notes.json")
+    storage = JournalStorage(path)
+    storage.save(Note(title="a", content=""))
+    storage.close()
+    with open(storage.log_path, 'a', encoding='utf-8') as f:
+        f.write('{"op": "put", "note": {"id": 9')  # Сбой во время записи
+
+    storage = JournalStorage(path)
+    storage.save(Note(title="b", content=""))
+    assert [note.title for note in storage.get_all()] == ["a", "b"]
+    storage.close()
+    assert [note.title for note in JournalStorage(path).get_all()] == ["a", "b"]
@@ -0,0 +1,21 @@
+"""Тесты модели заметки."""
+
+from notebook import Note
+from notebook.query import sort_key
+
+
+def test_created_at_round_trip():
+    """Дата не в формате ISO возвращается без изменений."""
+    for value in (None, 12345, "вчера", "2024-05-01T10:00:00+03:00", "2024-05-01T10:00:00"):
+        note = Note.from_dict({"id": 1, "title": "a", "content": "", "priority": "low",
+                               "status": "active", "tags": [], "created_at": value})
+        assert note.to_dict()["created_at"] == value
+
+
+def test_sort_by_created_with_null():
+    """Заметки без даты создания сортируются первыми."""
+    notes = [Note.from_dict({"id": i, "title": "a", "content": "", "priority": "low",
+                             "status": "active", "tags": [], "created_at": value})
+             for i, value in enumerate(["2024-05-01T10:00:00", None, 12345], 1)]
+    for field in ("created", "priority", "status"):
+        assert [note.id for note in sorted(notes, key=sort_key(field))] == [2, 3, 1]
@@ -0,0 +1,38 @@
+"""Тесты хранилища заметок в JSON-файле."""
+
+import io
+import json
+import time
+from notebook.storage import Storage, iter_json_array
+
+
+def test_iter_json_array_large_element():
+    """Элемент намного больше блока разбирается за линейное время."""
+    data = json.dumps([{"id": 1}, {"id": 2, "content": "x" * (4 << 20)}, 3.25, {"id": 3}])
+    start = time.perf_counter()
+    items = list(iter_json_array(io.StringIO(data), chunk_size=1024))
+    assert items == json.loads(data)
+    # Квадратичное дочитывание по блоку занимало бы минуты
+    assert time.perf_counter() - start < 5
+
+
+def test_iter_json_array_small_chunks():
+    """Числа и элементы на границах блоков не обрезаются."""
+    data = json.dumps([1.5, 123456789, [1, 2], {"a": "б"}, True, None] * 200)
+    for chunk_size in (1, 3, 7, 64):
+        assert list(iter_json_array(io.StringIO(data), chunk_size)) == json.loads(data)
+
+
+def test_import_skips_invalid_items(tmp_path):
+    """Некорректные элементы импорта пропускаются, остальные сохраняются."""
+    storage = Storage(str(tmp_path / "notes.json"))
+    items = [
+        {"title": "a", "content": "", "created_at": None},
+        {"title": "b", "content": "", "created_at": "вчера"},
+        {"title": "c", "content": "", "tags": "работа"},
+        {"title": "d", "content": "", "tags": [1]},
+        {"title": "e", "content": "", "tags": ["работа"], "created_at": "2024-01-01T00:00:00"},
+    ]
+    ids = storage.import_from(items)
+    assert ids[:4] == [None] * 4 and ids[4] is not None
+    assert [note.title for note in storage.get_all()] == ["e"]